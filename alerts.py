@@ -0,0 +1,265 @@
+"""Price alerts evaluated once per market snapshot.
+
+The alert engine subscribes to the snapshot refresher, so every tick is
+evaluated once per process no matter how many dashboards are open. Rules
+(config.ALERT_RULES) keep rolling state over the completed daily closes,
+which is advanced by the bars that are new since the last tick, so
+evaluating a rule against the current price is O(1).
+
+The last daily bar is treated as today's (possibly still forming) bar:
+its close is the current price, and it joins the completed closes once a
+newer bar appears. An alert fires once when its condition becomes true and
+stays active, without firing again, until the condition clears.
+"""
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+import numpy as np
+import config
+import config_reload
+import market_snapshot
+import metrics
+
+class RollingWindow:
+    """The last n values with their running sum."""
+
+    def __init__(self, n):
+        self.n = n
+        self.values = deque(maxlen=n)
+        self.total = 0.0
+
+    def push(self, value):
+        if len(self.values) == self.n:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+
+    @property
+    def full(self):
+        return len(self.values) == self.n
+
+    def mean(self):
+        return self.total / self.n
+
+    def mean_with(self, price):
+        """Mean of the window after pushing price, without pushing it."""
+        return (self.total - self.values[0] + price) / self.n
+
+class RollingExtremes:
+    """Maximum and minimum of the last n values, via monotonic deques."""
+
+    def __init__(self, n):
+        self.n = n
+        self.count = 0
+        self._max = deque()  # (position, value), values decreasing
+        self._min = deque()  # (position, value), values increasing
+
+    def push(self, value):
+        for window, beats in ((self._max, lambda a, b: a >= b), (self._min, lambda a, b: a <= b)):
+            while window and beats(value, window[-1][1]):
+                window.pop()
+            window.append((self.count, value))
+            if window[0][0] <= self.count - self.n:
+                window.popleft()
+        self.count += 1
+
+    @property
+    def full(self):
+        return self.count >= self.n
+
+    def high(self):
+        return self._max[0][1]
+
+    def low(self):
+        return self._min[0][1]
+
+def _alert(alert_id, message, color):
+    return {'id': alert_id, 'message': message, 'color': color}
+
+class PercentMoveRule:
+    """Current price against the close `days` completed bars ago."""
+
+    def __init__(self, days, up=None, down=None):
+        self.days = days
+        self.up = up
+        self.down = down
+        self.closes = deque(maxlen=days)
+
+    def push(self, close):
+        self.closes.append(close)
+
+    def evaluate(self, price):
+        if len(self.closes) < self.days:
+            return []
+        change = (price / self.closes[0] - 1) * 100
+        span = "since the previous close" if self.days == 1 else f"over {self.days} trading days"
+        if self.up is not None and change >= self.up:
+            return [_alert(f"move-{self.days}d-up", f"Price increased by {change:.2f}% {span} to ${price:.2f}", "success")]
+        if self.down is not None and change <= -self.down:
+            return [_alert(f"move-{self.days}d-down", f"Price decreased by {-change:.2f}% {span} to ${price:.2f}", "danger")]
+        return []
+
+class MovingAverageCrossRule:
+    """Fast and slow simple moving averages crossing today.
+
+    Today's averages include the current price; they are compared with the
+    averages at the last completed close.
+    """
+
+    def __init__(self, fast, slow):
+        self.fast = RollingWindow(fast)
+        self.slow = RollingWindow(slow)
+
+    def push(self, close):
+        self.fast.push(close)
+        self.slow.push(close)
+
+    def evaluate(self, price):
+        if not self.slow.full:
+            return []
+        was_above = self.fast.mean() > self.slow.mean()
+        is_above = self.fast.mean_with(price) > self.slow.mean_with(price)
+        fast, slow = self.fast.n, self.slow.n
+        if is_above and not was_above:
+            return [_alert(f"sma-{fast}-{slow}-golden",
+                           f"Golden cross: the {fast}-day average crossed above the {slow}-day average at ${price:.2f}",
+                           "success")]
+        if was_above and not is_above:
+            return [_alert(f"sma-{fast}-{slow}-death",
+                           f"Death cross: the {fast}-day average crossed below the {slow}-day average at ${price:.2f}",
+                           "danger")]
+        return []
+
+class ExtremeRule:
+    """Current price above the highest (or below the lowest) of the last `days` closes."""
+
+    def __init__(self, days):
+        self.days = days
+        self.window = RollingExtremes(days)
+
+    def push(self, close):
+        self.window.push(close)
+
+    def evaluate(self, price):
+        if not self.window.full:
+            return []
+        label = "52-week" if self.days == 252 else f"{self.days}-day"
+        if price > self.window.high():
+            return [_alert(f"extreme-{self.days}d-high", f"New {label} high at ${price:.2f}", "success")]
+        if price < self.window.low():
+            return [_alert(f"extreme-{self.days}d-low", f"New {label} low at ${price:.2f}", "danger")]
+        return []
+
+class TargetPriceRule:
+    """Current price at or above the target set for one vesting tranche."""
+
+    def __init__(self, tranche, price):
+        self.tranche = tranche
+        self.target = price
+
+    def push(self, close):
+        pass
+
+    def evaluate(self, price):
+        if price >= self.target:
+            return [_alert(f"target-{self.tranche}-{self.target}",
+                           f"Price ${price:.2f} reached the ${self.target:.2f} target for the {self.tranche} tranche",
+                           "info")]
+        return []
+
+RULE_TYPES = {
+    "move": PercentMoveRule,
+    "ma_cross": MovingAverageCrossRule,
+    "extreme": ExtremeRule,
+    "target": TargetPriceRule,
+}
+
+def build_rule(spec):
+    """Create a rule from a config.ALERT_RULES entry."""
+    options = dict(spec)
+    rule_type = options.pop("type")
+    if rule_type not in RULE_TYPES:
+        raise ValueError(f"Unknown alert rule type: {rule_type}")
+    return RULE_TYPES[rule_type](**options)
+
+class AlertEngine:
+    """Evaluates the alert rules on every snapshot and tracks the active alerts."""
+
+    def __init__(self, rules):
+        self.specs = list(rules)
+        self.revision = 0
+        self._active = {}
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.rules = [build_rule(spec) for spec in self.specs]
+        self._last_bar = None  # (date, close) of the newest completed bar pushed
+
+    def set_rules(self, specs):
+        """Replace the rules; their rolling state is rebuilt from the next snapshot."""
+        rules = [build_rule(spec) for spec in specs]  # Invalid specs raise before anything changes
+        with self._lock:
+            self.specs = list(specs)
+            self.rules = rules
+            self._last_bar = None
+
+    def on_snapshot(self, snapshot):
+        """Advance the rules to the snapshot's bars and evaluate its price."""
+        if snapshot.current_price is None:
+            return
+        with self._lock:
+            self._advance(snapshot.history)
+            price = float(snapshot.current_price)
+            current = {}
+            for rule in self.rules:
+                for alert in rule.evaluate(price):
+                    current[alert['id']] = self._active.get(alert['id']) or self._fire(alert)
+            if current.keys() != self._active.keys():
+                self.revision += 1
+            self._active = current
+
+    def _advance(self, history):
+        """Push the daily closes completed since the last tick into every rule."""
+        if history is None or len(history) < 2:
+            return
+        dates = history.index
+        closes = history['Close'].to_numpy()
+        start = 0
+        if self._last_bar is not None:
+            date, close = self._last_bar
+            position = dates.searchsorted(date)
+            if position < len(dates) - 1 and dates[position] == date and np.isclose(closes[position], close):
+                start = position + 1
+            else:
+                # History was re-adjusted or replaced; rebuild the rolling state
+                self._reset()
+        completed = len(dates) - 1  # The last bar is today's
+        for position in range(start, completed):
+            for rule in self.rules:
+                rule.push(float(closes[position]))
+        if completed > start:
+            self._last_bar = (dates[completed - 1], closes[completed - 1])
+
+    def _fire(self, alert):
+        alert = dict(alert, fired_at=datetime.now())
+        logging.info(f"Alert: {alert['message']}")
+        metrics.ALERTS_FIRED.inc(rule=alert['id'])
+        return alert
+
+    def active(self):
+        """Return (revision, active alerts, most recently fired first)."""
+        with self._lock:
+            alerts = sorted(self._active.values(), key=lambda alert: alert['fired_at'], reverse=True)
+            return self.revision, alerts
+
+# One engine per process, fed by the shared snapshot refresher
+engine = AlertEngine(config.ALERT_RULES)
+market_snapshot.refresher.subscribe(engine.on_snapshot)
+
+def _reload_rules():
+    engine.set_rules(config.ALERT_RULES)
+    engine.on_snapshot(market_snapshot.refresher.latest())
+
+config_reload.on_change(["ALERT_RULES", "PRICE_INCREASE_ALERT", "PRICE_DECREASE_ALERT"], _reload_rules)
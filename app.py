@@ -1,16 +1,29 @@
 import dash
-from dash import dcc, html, dash_table, callback, Input, Output, State
+from dash import dcc, html, dash_table, callback, Input, Output, State, Patch, ClientsideFunction
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
-import plotly.express as px
+from plotly.colors import qualitative
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import stock_data
+import market_snapshot
+import simulation
+import backtest
 import config
+import store_codec
+import stream
+import metrics
+import profiler
+import alerts
+import profiles
+import downsample
 import socket
+import json
+import hashlib
 import os
 import sys
+import threading
 
 # Initialize the Dash app
 app = dash.Dash(__name__, 
@@ -18,10 +31,42 @@ app = dash.Dash(__name__,
                 meta_tags=[{"name": "viewport", "content": "width=device-width, initial-scale=1"}])
 
 server = app.server
+stream.register(server)
+metrics.register(server)
+profiler.register(app)
 app.title = f"{config.STOCK_NAME} RSU Tracker"
 
-# Cache for storing the last price to check alerts
-last_price = None
+# Encoded dcc.Store payloads and downsampled chart series per snapshot
+# version, shared by every client
+store_payloads = stock_data.PlanCache(config.STORE_PAYLOAD_CACHE_SIZE, name="store_payloads")
+
+# Finished figure JSON of panels whose inputs rarely change, keyed by input hash
+figure_cache = stock_data.PlanCache(config.FIGURE_CACHE_SIZE, name="figures")
+
+def _overlay_options():
+    """Indicator overlays of the price chart, in the order they are drawn."""
+    return (
+        [{"label": f"SMA {n}", "value": f"sma_{n}"} for n in config.SMA_WINDOWS]
+        + [{"label": f"EMA {n}", "value": f"ema_{n}"} for n in config.EMA_WINDOWS]
+        + [
+            {"label": f"Bollinger ({config.BOLLINGER_WINDOW}, {config.BOLLINGER_STD})", "value": "bollinger"},
+            {"label": "VWAP", "value": "vwap"},
+            {"label": f"RSI {config.RSI_WINDOW}", "value": "rsi"},
+        ]
+    )
+
+def _overlay_columns(overlays):
+    """Indicator columns of the selected overlays, in drawing order."""
+    selected = set(overlays or ())
+    columns = []
+    for option in _overlay_options():
+        if option["value"] in selected:
+            columns += ["bb_upper", "bb_lower"] if option["value"] == "bollinger" else [option["value"]]
+    return columns
+
+def _cached_figure(key, build):
+    """Return the figure JSON for key, building the figure only on a miss."""
+    return figure_cache.get(key, lambda: json.loads(build().to_json()))
 
 # Get hostname and IP for sharing info
 def get_ip_address():
@@ -35,7 +80,16 @@ def get_ip_address():
         return "Could not determine IP"
 
 hostname = socket.gethostname()
-ip_address = get_ip_address()
+
+# Discovered on a background thread so importing the app never waits on the
+# network; the network info callback shows it once known
+ip_address = "Discovering..."
+
+def _discover_ip_address():
+    global ip_address
+    ip_address = get_ip_address()
+
+threading.Thread(target=_discover_ip_address, name="ip-discovery", daemon=True).start()
 
 # Layout components
 navbar = dbc.Navbar(
@@ -45,7 +99,7 @@ navbar = dbc.Navbar(
                 dbc.Row(
                     [
                         dbc.Col(html.Img(src="https://d1.awsstatic.com/logos/aws-logo-lockups/powerredby/PB_AWS_logo_RGB_stacked_REV_SQ.91cd4af40773cbfbd15577a3c2b8a346fe3e8fa2.png", height="30px")),
-                        dbc.Col(dbc.NavbarBrand(f"{config.STOCK_NAME} RSU Tracker", className="ms-2")),
+                        dbc.Col(dbc.NavbarBrand(f"{config.STOCK_NAME} RSU Tracker", id="navbar-brand", className="ms-2")),
                     ],
                     align="center",
                 ),
@@ -56,6 +110,7 @@ navbar = dbc.Navbar(
                 [
                     dbc.Col(
                         [
+                            dbc.Badge("Data: --", id="upstream-status", color="secondary", className="me-2"),
                             html.Div(id="network-info", className="text-light", style={"fontSize": "0.8rem"}),
                             dbc.Button(
                                 "Network Access", id="modal-button", size="sm", color="light", className="ml-2"
@@ -76,9 +131,7 @@ network_modal = dbc.Modal(
         dbc.ModalBody([
             html.P("Access this dashboard from any device on your network using:"),
             html.Ul([
-                html.Li([html.Strong("URL: "), html.A(f"http://{ip_address}:{config.DEFAULT_PORT}", 
-                                                     href=f"http://{ip_address}:{config.DEFAULT_PORT}", 
-                                                     target="_blank")]),
+                html.Li([html.Strong("URL: "), html.A(id="modal-network-url", target="_blank")]),
                 html.Li([html.Strong("Hostname: "), f"{hostname}:{config.DEFAULT_PORT}"]),
             ]),
             html.P("Note: Devices must be on the same network to access this URL.")
@@ -93,6 +146,7 @@ network_modal = dbc.Modal(
 
 # App Layout
 app.layout = html.Div([
+    dcc.Location(id="url", refresh=False),  # /<profile> selects the RSU profile
     navbar,
     network_modal,
     dbc.Container([
@@ -101,30 +155,6 @@ app.layout = html.Div([
         html.Div(id="data-error-message", className="alert alert-danger mt-3", 
                  children="Failed to load stock data. Check your internet connection.", style={"display": "none"}),
         
-        dbc.Row([
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardHeader("Amazon Stock Overview"),
-                    dbc.CardBody([
-                        dbc.Row([
-                            dbc.Col([
-                                html.H3(id="current-price", children="--"),
-                                html.P("Current Price (USD)"),
-                            ], width=4),
-                            dbc.Col([
-                                html.H3(id="price-change", children="--"),
-                                html.P("Today's Change"),
-                            ], width=4),
-                            dbc.Col([
-                                html.H3(id="total-rsu-value", children="--"),
-                                html.P("RSU Value (USD)"),
-                            ], width=4),
-                        ]),
-                    ]),
-                ], className="mt-3"),
-            ], width=12),
-        ]),
-        
         # Stock Price Information Section
         dbc.Row([
             dbc.Col([
@@ -174,9 +204,28 @@ app.layout = html.Div([
                                     className="mb-3",
                                 )
                             ], width=6),
+                            dbc.Col([
+                                dbc.Label("Indicators"),
+                                dcc.Dropdown(
+                                    id="indicator-overlays",
+                                    options=_overlay_options(),
+                                    value=config.DEFAULT_OVERLAYS,
+                                    multi=True,
+                                    className="mb-3",
+                                )
+                            ], width=6),
                         ]),
                     ]),
                 ], className="mb-4"),
+                
+                # Intraday Chart
+                dbc.Card([
+                    dbc.CardHeader("Intraday"),
+                    dbc.CardBody([
+                        dcc.Graph(id="intraday-chart"),
+                    ]),
+                ], id="intraday-card", className="mb-4",
+                   style={"display": "block" if config.INTRADAY_ENABLED else "none"}),
             ], width=12, lg=6),
             
             # RSU Information Section
@@ -238,6 +287,81 @@ app.layout = html.Div([
                 ),
             ], width=12),
         ], className="mt-4"),
+        
+        # Strategy Comparison Section
+        dbc.Row([
+            dbc.Col([
+                html.H4("Strategy Comparison"),
+                dbc.Card([
+                    dbc.CardBody([
+                        dcc.Graph(id="comparison-chart"),
+                        dash_table.DataTable(
+                            id="comparison-table",
+                            style_table={"overflowX": "auto"},
+                            style_cell={
+                                "textAlign": "left",
+                                "padding": "10px",
+                                "minWidth": "80px",
+                            },
+                            style_header={
+                                "backgroundColor": "rgb(230, 230, 230)",
+                                "fontWeight": "bold",
+                            },
+                        ),
+                    ]),
+                ]),
+            ], width=12),
+        ], className="mt-4"),
+        
+        # Monte Carlo Outcomes Section
+        dbc.Row([
+            dbc.Col([
+                html.H4("Selling Outcomes (Monte Carlo)"),
+                dbc.Card([
+                    dbc.CardBody([
+                        dcc.Graph(id="simulation-chart"),
+                        dash_table.DataTable(
+                            id="simulation-table",
+                            style_table={"overflowX": "auto"},
+                            style_cell={
+                                "textAlign": "left",
+                                "padding": "10px",
+                                "minWidth": "80px",
+                            },
+                            style_header={
+                                "backgroundColor": "rgb(230, 230, 230)",
+                                "fontWeight": "bold",
+                            },
+                        ),
+                    ]),
+                ]),
+            ], width=12),
+        ], className="mt-4"),
+        
+        # Historical Backtest Section
+        dbc.Row([
+            dbc.Col([
+                html.H4("Strategy Backtest"),
+                dbc.Card([
+                    dbc.CardBody([
+                        dcc.Graph(id="backtest-chart"),
+                        dash_table.DataTable(
+                            id="backtest-table",
+                            style_table={"overflowX": "auto"},
+                            style_cell={
+                                "textAlign": "left",
+                                "padding": "10px",
+                                "minWidth": "80px",
+                            },
+                            style_header={
+                                "backgroundColor": "rgb(230, 230, 230)",
+                                "fontWeight": "bold",
+                            },
+                        ),
+                    ]),
+                ]),
+            ], width=12),
+        ], className="mt-4 mb-4"),
     ]),
     
     # Network Information Footer
@@ -249,7 +373,7 @@ app.layout = html.Div([
                 html.P([
                     "This dashboard is accessible on your local network at: ",
                     html.Br(),
-                    html.Code(f"http://{ip_address}:{config.DEFAULT_PORT}"),
+                    html.Code(id="footer-network-url"),
                     html.Br(),
                     "Hostname: ",
                     html.Code(hostname)
@@ -264,11 +388,25 @@ app.layout = html.Div([
     
     # Store components for data
     dcc.Store(id="stock-data-store"),
+    dcc.Store(id="price-chart-state"),  # What the rendered price chart shows, for patching
+    dcc.Store(id="intraday-data-store"),
+    dcc.Store(id="intraday-chart-state"),
     dcc.Store(id="vesting-data-store"),
     dcc.Store(id="selling-data-store"),
+    # Content fingerprints of the stores above, to skip unchanged updates
+    dcc.Store(id="stock-data-fingerprint"),
+    dcc.Store(id="vesting-data-fingerprint"),
+    dcc.Store(id="selling-data-fingerprint"),
+    dcc.Store(id="intraday-data-fingerprint"),
     dcc.Store(id="last-price-store"),
+    dcc.Store(id="alerts-revision"),  # Alert engine revision the alerts section shows
     
-    # Interval for automatic updates
+    # assets/stream.js fills market-tick from the /stream push channel, or
+    # from GET /tick on the interval while the stream is disconnected. Market
+    # data callbacks fire on the tick-<topic> stores split from it, which
+    # change only when their topic does.
+    dcc.Store(id="market-tick"),
+    *[dcc.Store(id=f"tick-{topic}") for topic in stream.TICK_TOPICS],
     dcc.Interval(
         id="interval-component",
         interval=config.REFRESH_INTERVAL * 1000,  # in milliseconds
@@ -276,86 +414,189 @@ app.layout = html.Div([
     ),
 ], className="dashboard-container")
 
+# Polling fallback for when the stream is not connected
+app.clientside_callback(
+    ClientsideFunction("stream", "poll"),
+    Output("market-tick", "data"),
+    Input("interval-component", "n_intervals"),
+    prevent_initial_call=True
+)
+
+# Only the topics that changed reach the server callbacks
+app.clientside_callback(
+    ClientsideFunction("stream", "split"),
+    [Output(f"tick-{topic}", "data") for topic in stream.TICK_TOPICS],
+    Input("market-tick", "data"),
+    [State(f"tick-{topic}", "data") for topic in stream.TICK_TOPICS],
+    prevent_initial_call=True
+)
+
 # Callback to update the stock data store
+
+# Store callbacks return no_update when the content fingerprint matches the
+# previous payload, so dependent charts and tables do not rebuild
 @app.callback(
     Output("stock-data-store", "data"),
-    Input("interval-component", "n_intervals"),
-    Input("time-period", "value")
+    Output("stock-data-fingerprint", "data"),
+    Input("tick-history", "data"),
+    Input("tick-config", "data"),
+    Input("time-period", "value"),
+    Input("indicator-overlays", "value"),
+    State("stock-data-fingerprint", "data")
 )
-def update_stock_data(n_intervals, time_period):
+def update_stock_data(history_tick, config_tick, time_period, overlays, last_fingerprint):
     if time_period is None:
         time_period = "1y"
     
-    hist_data = stock_data.get_historical_data(period=time_period)
-    hist_data_dict = {
-        'date': hist_data.index.strftime('%Y-%m-%d').tolist(),
-        'open': hist_data['Open'].tolist(),
-        'high': hist_data['High'].tolist(),
-        'low': hist_data['Low'].tolist(),
-        'close': hist_data['Close'].tolist(),
-        'volume': hist_data['Volume'].tolist()
-    }
+    snapshot = market_snapshot.get_snapshot()
+    hist_data = stock_data.slice_period(snapshot.history, time_period)
+    columns = _overlay_columns(overlays)
+    settings = stock_data.indicator_settings() if columns else None
     
-    # Store current price for alerts
-    global last_price
-    if len(hist_data) > 0:
-        last_price = hist_data['Close'].iloc[-2] if len(hist_data) > 1 else None
+    def encode():
+        bars = hist_data[['Open', 'High', 'Low', 'Close', 'Volume']]
+        if columns:
+            # Sliced from indicators kept over the full history, not recomputed per period
+            indicators = stock_data.get_indicators(snapshot.symbol, time_period, snapshot.history, columns)
+            bars = bars.assign(**{column: indicators[column].to_numpy() for column in columns})
+        # Long ranges become weekly/monthly candles so the chart stays within budget
+        bars, bar_size = downsample.downsample_ohlcv(bars, config.CHART_MAX_POINTS)
+        return store_codec.encode_frame(bars.rename(columns=str.lower), index='date',
+                                        meta={'bar_size': bar_size, 'period': time_period, 'overlays': columns,
+                                              'indicators': settings})
     
-    return hist_data_dict
+    payload = store_payloads.get(
+        ("stock", snapshot.version, time_period, tuple(columns), repr(settings), config.CHART_MAX_POINTS), encode
+    )
+    return _unless_unchanged(payload, last_fingerprint)
+
+def _unless_unchanged(payload, last_fingerprint):
+    """Store outputs for a payload, or no_update if it matches the last fingerprint."""
+    fingerprint = store_codec.fingerprint(payload)
+    if fingerprint is not None and fingerprint == last_fingerprint:
+        return dash.no_update, dash.no_update
+    return payload, fingerprint
+
+# Intraday bars come from the fixed-size ring in stock_data, refreshed with
+# the snapshot
+@app.callback(
+    Output("intraday-data-store", "data"),
+    Output("intraday-data-fingerprint", "data"),
+    Input("tick-intraday", "data"),
+    Input("tick-config", "data"),
+    State("intraday-data-fingerprint", "data")
+)
+def update_intraday_data(intraday_tick, config_tick, last_fingerprint):
+    snapshot = market_snapshot.get_snapshot()
+    bars = snapshot.intraday
+    if bars is None or bars.empty:
+        return None, None
+    
+    payload = store_payloads.get(
+        ("intraday", snapshot.version),
+        lambda: store_codec.encode_frame(bars.rename(columns=str.lower), index='date',
+                                         meta={'interval': config.INTRADAY_INTERVAL,
+                                               'previous_close': snapshot.previous_close})
+    )
+    return _unless_unchanged(payload, last_fingerprint)
+
+# The URL path selects the RSU profile (see profiles.py); market data is
+# shared by all profiles, vesting and plans are computed per profile
+@app.callback(
+    Output("navbar-brand", "children"),
+    Output("selling-strategy", "value"),
+    Input("url", "pathname")
+)
+def select_profile(pathname):
+    name, profile = profiles.profile_from_path(pathname)
+    title = f"{config.STOCK_NAME} RSU Tracker"
+    if profile is None:
+        return f"{title} - unknown profile '{name}'", config.DEFAULT_STRATEGY
+    if name == profiles.DEFAULT:
+        return title, profile.default_strategy
+    return f"{title} - {name}", profile.default_strategy
+
+# Overlay choices follow the indicator settings, which a config reload can
+# change; the tick after a reload carries a new config revision
+@app.callback(
+    Output("indicator-overlays", "options"),
+    Input("tick-config", "data"),
+    Input("url", "pathname"),
+    State("indicator-overlays", "options")
+)
+def update_overlay_options(config_tick, pathname, current_options):
+    options = _overlay_options()
+    if options == current_options:
+        return dash.no_update
+    return options
+
+def _profile(pathname):
+    """The profile a dashboard URL selects, or None for an unknown one."""
+    return profiles.profile_from_path(pathname)[1]
 
 # Callback to update the vesting data store
 @app.callback(
     Output("vesting-data-store", "data"),
-    Input("interval-component", "n_intervals")
+    Output("vesting-data-fingerprint", "data"),
+    Input("tick-history", "data"),
+    Input("tick-config", "data"),
+    Input("url", "pathname"),
+    State("vesting-data-fingerprint", "data")
 )
-def update_vesting_data(n_intervals):
-    vesting_df = stock_data.calculate_shares_from_vesting()
-    
-    vesting_data_dict = {
-        'date': vesting_df['date'].dt.strftime('%Y-%m-%d').tolist(),
-        'percentage': vesting_df['percentage'].tolist(),
-        'value_usd': vesting_df['value_usd'].tolist(),
-        'shares': vesting_df['shares'].tolist(),
-        'price_at_vesting': vesting_df['price_at_vesting'].tolist() if 'price_at_vesting' in vesting_df.columns else []
-    }
+def update_vesting_data(history_tick, config_tick, pathname, last_fingerprint):
+    profile = _profile(pathname)
+    snapshot = market_snapshot.get_snapshot()
+    vesting_df = None if profile is None else market_snapshot.get_vesting(snapshot, profile)
+    if vesting_df is None:
+        return None, None
     
-    return vesting_data_dict
+    columns = [c for c in ['date', 'percentage', 'value_usd', 'shares', 'price_at_vesting']
+               if c in vesting_df.columns]
+    payload = store_payloads.get(
+        ("vesting", snapshot.version, profile.vesting_key),
+        lambda: store_codec.encode_frame(vesting_df[columns], precise=('value_usd', 'shares'),
+                                         meta={'exchange_rate': profile.currency_exchange_rate})
+    )
+    return _unless_unchanged(payload, last_fingerprint)
 
 # Callback to update the selling data store
 @app.callback(
     Output("selling-data-store", "data"),
-    Input("interval-component", "n_intervals"),
-    Input("selling-strategy", "value")
+    Output("selling-data-fingerprint", "data"),
+    Input("tick-history", "data"),
+    Input("tick-plan_price", "data"),
+    Input("tick-config", "data"),
+    Input("selling-strategy", "value"),
+    Input("url", "pathname"),
+    State("selling-data-fingerprint", "data")
 )
-def update_selling_data(n_intervals, strategy):
+def update_selling_data(history_tick, plan_price_tick, config_tick, strategy, pathname, last_fingerprint):
+    profile = _profile(pathname)
+    if profile is None:
+        return None, None
     if strategy is None:
-        strategy = config.DEFAULT_STRATEGY
-    
-    selling_df = stock_data.calculate_selling_strategy(strategy)
-    
-    selling_data_dict = {
-        'date': selling_df.index.strftime('%Y-%m-%d').tolist(),
-        'month': selling_df['month'].tolist(),
-        'shares_to_sell': selling_df['shares_to_sell'].tolist(),
-        'cumulative_shares': selling_df['cumulative_shares'].tolist(),
-        'remaining_shares': selling_df['remaining_shares'].tolist(),
-        'percent_sold_this_month': selling_df['percent_sold_this_month'].tolist(),
-        'percent_sold_cumulative': selling_df['percent_sold_cumulative'].tolist(),
-        'percent_remaining': selling_df['percent_remaining'].tolist()
-    }
+        strategy = profile.default_strategy
     
-    # Add strategy-specific columns
-    if strategy == "equal_value" and 'target_value' in selling_df.columns:
-        selling_data_dict['target_value'] = selling_df['target_value'].tolist()
-        selling_data_dict['estimated_shares'] = selling_df['estimated_shares'].tolist()
-    
-    if strategy == "dollar_cost_averaging" and 'price_factor' in selling_df.columns:
-        selling_data_dict['price_factor'] = selling_df['price_factor'].tolist()
-    
-    if strategy == "reserve_strategy" and 'period' in selling_df.columns:
-        selling_data_dict['period'] = selling_df['period'].tolist()
+    snapshot = market_snapshot.get_snapshot()
+    vesting_df = market_snapshot.get_vesting(snapshot, profile)
+    # Nothing to plan with before the first price and history arrive
+    if vesting_df is None or snapshot.current_price is None:
+        return None, None
+    selling_df = stock_data.calculate_selling_strategy(
+        strategy,
+        vesting_df=vesting_df,
+        current_price=snapshot.current_price,
+        hist_data=snapshot.history,
+        profile=profile
+    )
     
-    return selling_data_dict
+    # Includes the strategy-specific columns (target_value, price_factor, period)
+    payload = store_payloads.get(
+        ("selling", snapshot.version, strategy, profile.vesting_key, profile.plan_key(strategy)),
+        lambda: store_codec.encode_frame(selling_df, index='date',
+                                         meta={'exchange_rate': profile.currency_exchange_rate})
+    )
+    return _unless_unchanged(payload, last_fingerprint)
 
 # Callbacks to update UI elements
 @app.callback(
@@ -366,19 +607,20 @@ def update_selling_data(n_intervals, strategy):
         Output("total-value", "children"),
         Output("last-price-store", "data")
     ],
-    Input("interval-component", "n_intervals"),
-    State("vesting-data-store", "data")
+    Input("tick-price", "data"),
+    Input("vesting-data-store", "data")  # Total value changes with the share counts too
 )
-def update_price_info(n_intervals, vesting_data):
+def update_price_info(price_tick, vesting_data):
     try:
-        current_price = stock_data.get_current_price()
+        snapshot = market_snapshot.get_snapshot()
+        current_price = snapshot.current_price
         
-        # Calculate daily change
-        ticker = stock_data.yf.Ticker(config.STOCK_SYMBOL)
-        today_data = ticker.history(period='1d')
+        # Calculate daily change against the previous session's close from
+        # the intraday bars, or today's open when they are not available
+        today_data = snapshot.today
         
         if not today_data.empty:
-            prev_close = today_data['Open'].iloc[0]
+            prev_close = snapshot.previous_close or today_data['Open'].iloc[0]
             change = current_price - prev_close
             pct_change = (change / prev_close) * 100
             change_text = f"${change:.2f} ({pct_change:.2f}%)"
@@ -391,8 +633,9 @@ def update_price_info(n_intervals, vesting_data):
         
         # Calculate total value
         total_value = "N/A"
-        if vesting_data and 'shares' in vesting_data:
-            total_shares = sum(vesting_data['shares'])
+        vesting_df = store_codec.decode_frame(vesting_data)
+        if vesting_df is not None:
+            total_shares = vesting_df['shares'].sum()
             total_value = f"${total_shares * current_price:,.2f}"
         
         return f"${current_price:.2f}", change_text, className, total_value, current_price
@@ -403,48 +646,167 @@ def update_price_info(n_intervals, vesting_data):
 
 @app.callback(
     Output("price-chart", "figure"),
+    Output("price-chart-state", "data"),
     Input("stock-data-store", "data"),
-    Input("vesting-data-store", "data")
+    Input("vesting-data-store", "data"),
+    State("price-chart-state", "data")
 )
-def update_price_chart(stock_data_dict, vesting_data_dict):
-    if stock_data_dict is None:
-        return go.Figure()
+def update_price_chart(stock_data_dict, vesting_data_dict, chart_state):
+    stock_df = store_codec.decode_frame(stock_data_dict)
+    if stock_df is None:
+        return go.Figure(), None
     
     # Create DataFrame from stock data
-    dates = pd.to_datetime(stock_data_dict['date'])
-    df = pd.DataFrame({
-        'Date': dates,
-        'Open': stock_data_dict['open'],
-        'High': stock_data_dict['high'],
-        'Low': stock_data_dict['low'],
-        'Close': stock_data_dict['close'],
-        'Volume': stock_data_dict['volume']
-    })
+    df = stock_df.rename(columns={c: c.capitalize() for c in ('date', 'open', 'high', 'low', 'close', 'volume')})
+    dates = df['Date'].dt.strftime('%Y-%m-%d').tolist()
+    new_state = {
+        'period': stock_data_dict.get('period'),
+        'bar_size': stock_data_dict.get('bar_size'),
+        'overlays': stock_data_dict.get('overlays', []),
+        'indicators': stock_data_dict.get('indicators'),
+        'vesting': store_codec.fingerprint(vesting_data_dict),
+        **_bars_state(df, dates),
+    }
+    
+    # After the first render only the last candle changes between ticks, so
+    # patch it in place unless the period, the vesting data or any earlier
+    # bar (a re-adjusted history) changed
+    patch = _price_chart_patch(chart_state, new_state, df, dates)
+    if patch is not None:
+        return patch, new_state
+    return _price_figure(df, dates, vesting_data_dict, new_state['bar_size'], new_state['overlays']), new_state
+
+def _bars_fingerprint(df):
+    """Content hash of OHLCV bars."""
+    values = df[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy(dtype=np.float64)
+    return hashlib.blake2b(np.ascontiguousarray(values).tobytes(), digest_size=8).hexdigest()
+
+def _bars_state(df, dates):
+    """Chart state of the bars: date range, length and settled-bar hashes.
+
+    'settled' covers every bar but the forming last one; 'settled_tail' the
+    same bars without the first, for a rolling window that drops it.
+    """
+    return {
+        'first': dates[0] if dates else None,
+        'last': dates[-1] if dates else None,
+        'length': len(dates),
+        'settled': _bars_fingerprint(df.iloc[:-1]),
+        'settled_tail': _bars_fingerprint(df.iloc[1:-1]),
+    }
+
+def _price_chart_patch(old_state, new_state, df, dates):
+    """Partial update of the price chart from old_state to the new bars.
+
+    Handles the last bar moving, and one new bar being appended (dropping
+    a bar from the front when the window rolls). Returns None when the figure
+    must be rebuilt instead, e.g. after the indicator settings were reloaded
+    or a split or dividend re-adjusted the earlier bars.
+    """
+    keys = ('period', 'bar_size', 'vesting', 'overlays', 'indicators')
+    if not old_state or any(old_state.get(k) != new_state[k] for k in keys):
+        return None
+    
+    old_length, length = old_state['length'], new_state['length']
+    if length == 0:
+        return None
+    dropped = old_length + 1 - length  # Bars that left the front of a rolling window
+    same_bars = (dates[-1] == old_state['last'] and dates[0] == old_state['first'] and length == old_length
+                 and new_state['settled'] == old_state.get('settled'))
+    # The bars before the previous last one must be unchanged as well
+    settled = {0: old_state.get('settled'), 1: old_state.get('settled_tail')}.get(dropped)
+    appended = (length >= 2 and dates[-2] == old_state['last'] and dates[-1] > old_state['last']
+                and 0 <= dropped < length and (dropped == 0) == (dates[0] == old_state['first'])
+                and settled is not None and _bars_fingerprint(df.iloc[:-2]) == settled)
+    overlays = new_state['overlays']
+    if not (same_bars or appended) or (appended and dropped and 'vwap' in overlays):
+        return None  # VWAP is anchored at the first bar, so a rolled window changes all of it
+    
+    patch = Patch()
+    candles, volume = patch['data'][0], patch['data'][1]
+    lines = [patch['data'][2 + i] for i in range(len(overlays))]
     
+    def set_bar(position, row):
+        for key in ('Open', 'High', 'Low', 'Close'):
+            candles[key.lower()][position] = float(df[key].iloc[row])
+        volume['y'][position] = int(df['Volume'].iloc[row])
+        for line, column in zip(lines, overlays):
+            line['y'][position] = _plain(df[column].iloc[row])
+    
+    if same_bars:
+        set_bar(length - 1, -1)
+        return patch
+    
+    # The previous last bar is final now; then add the new one
+    set_bar(old_length - 1, -2)
+    for key in ('Open', 'High', 'Low', 'Close'):
+        candles[key.lower()].append(float(df[key].iloc[-1]))
+    candles['x'].append(dates[-1])
+    volume['x'].append(dates[-1])
+    volume['y'].append(int(df['Volume'].iloc[-1]))
+    for line, column in zip(lines, overlays):
+        line['x'].append(dates[-1])
+        line['y'].append(_plain(df[column].iloc[-1]))
+    for _ in range(dropped):
+        for key in ('x', 'open', 'high', 'low', 'close'):
+            del candles[key][0]
+        for trace in [volume] + lines:
+            del trace['x'][0]
+            del trace['y'][0]
+    return patch
+
+def _plain(value):
+    """A JSON-ready float, with missing (warm-up) indicator values as None."""
+    return None if pd.isna(value) else float(value)
+
+# Line style of each indicator column on the price chart
+OVERLAY_STYLES = {
+    'bb_upper': dict(name='Bollinger upper', line=dict(width=1, dash='dash', color='rgba(120, 120, 120, 0.8)')),
+    'bb_lower': dict(name='Bollinger lower', line=dict(width=1, dash='dash', color='rgba(120, 120, 120, 0.8)'),
+                     fill='tonexty', fillcolor='rgba(150, 150, 150, 0.1)'),
+    'vwap': dict(name='VWAP', line=dict(width=1.5, dash='dot')),
+    'rsi': dict(name='RSI', line=dict(width=1.5, color='purple'), yaxis='y3'),
+}
+
+def _overlay_trace(dates, column, values):
+    name = column.replace('_', ' ').upper()  # sma_50 -> "SMA 50"
+    style = OVERLAY_STYLES.get(column, dict(line=dict(width=1.5)))
+    return go.Scatter(x=dates, y=[_plain(v) for v in values], mode='lines', **{'name': name, **style})
+
+def _price_figure(df, dates, vesting_data_dict, bar_size, overlays=()):
+    """Build the full price chart; data is passed as lists so it can be patched.
+
+    Indicator overlays follow the candles and volume as traces 2, 3, ... in
+    the order of overlays; RSI gets its own axis below the price.
+    """
     # Create candlestick chart
     fig = go.Figure(data=[go.Candlestick(
-        x=df['Date'],
-        open=df['Open'],
-        high=df['High'],
-        low=df['Low'],
-        close=df['Close'],
+        x=dates,
+        open=df['Open'].tolist(),
+        high=df['High'].tolist(),
+        low=df['Low'].tolist(),
+        close=df['Close'].tolist(),
         name='OHLC'
     )])
     
     # Add volume bars
     fig.add_trace(go.Bar(
-        x=df['Date'],
-        y=df['Volume'],
+        x=dates,
+        y=df['Volume'].tolist(),
         name='Volume',
         yaxis='y2',
         marker_color='rgba(200, 200, 200, 0.5)',
         opacity=0.5
     ))
     
+    for column in overlays:
+        fig.add_trace(_overlay_trace(dates, column, df[column]))
+    
     # Add vesting dates if available
-    if vesting_data_dict and 'date' in vesting_data_dict:
-        vesting_dates = pd.to_datetime(vesting_data_dict['date'])
-        vesting_values = vesting_data_dict['value_usd']
+    vesting_df = store_codec.decode_frame(vesting_data_dict)
+    if vesting_df is not None:
+        vesting_dates = vesting_df['date']
+        vesting_values = vesting_df['value_usd']
         
         for i, date in enumerate(vesting_dates):
             if date in df['Date'].values or (date >= df['Date'].min() and date <= df['Date'].max()):
@@ -459,7 +821,9 @@ def update_price_chart(stock_data_dict, vesting_data_dict):
     
     # Update layout for dual axis
     fig.update_layout(
-        title=f"{config.STOCK_NAME} Stock Price",
+        title=f"{config.STOCK_NAME} Stock Price" + (
+            f" ({bar_size} bars)" if bar_size not in (None, 'daily') else ""
+        ),
         xaxis_title="Date",
         yaxis_title="Price ($)",
         yaxis2=dict(
@@ -473,6 +837,85 @@ def update_price_chart(stock_data_dict, vesting_data_dict):
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
     )
     
+    if 'rsi' in overlays:
+        fig.update_layout(
+            height=650,
+            xaxis=dict(anchor="y3"),  # Dates (and range slider) below the RSI panel
+            yaxis=dict(domain=[0.3, 1]),
+            yaxis3=dict(title="RSI", domain=[0, 0.2], range=[0, 100], tickvals=[30, 70]),
+        )
+        for level in (30, 70):
+            fig.add_shape(type="line", xref="paper", x0=0, x1=1, yref="y3", y0=level, y1=level,
+                          line=dict(width=1, dash="dot", color="gray"))
+    
+    return fig
+
+@app.callback(
+    Output("intraday-chart", "figure"),
+    Output("intraday-chart-state", "data"),
+    Input("intraday-data-store", "data"),
+    State("intraday-chart-state", "data")
+)
+def update_intraday_chart(intraday_data_dict, chart_state):
+    bars = store_codec.decode_frame(intraday_data_dict)
+    if bars is None:
+        return go.Figure(), None
+    
+    df = bars.rename(columns={c: c.capitalize() for c in ('date', 'open', 'high', 'low', 'close', 'volume')})
+    dates = df['Date'].dt.strftime('%Y-%m-%d %H:%M').tolist()
+    new_state = {
+        'period': 'intraday',
+        'bar_size': intraday_data_dict.get('interval'),
+        'previous_close': intraday_data_dict.get('previous_close'),
+        'overlays': [],
+        'indicators': None,
+        'vesting': None,
+        **_bars_state(df, dates),
+    }
+    
+    # Same trace layout as the price chart, so ticks patch the forming bar
+    # and append new ones the same way
+    if chart_state and chart_state.get('previous_close') == new_state['previous_close']:
+        patch = _price_chart_patch(chart_state, new_state, df, dates)
+        if patch is not None:
+            return patch, new_state
+    return _intraday_figure(df, dates, new_state['bar_size'], new_state['previous_close']), new_state
+
+def _intraday_figure(df, dates, interval, previous_close):
+    """Candles and volume of the recent sessions, with overnight gaps removed."""
+    fig = go.Figure(data=[go.Candlestick(
+        x=dates,
+        open=df['Open'].tolist(),
+        high=df['High'].tolist(),
+        low=df['Low'].tolist(),
+        close=df['Close'].tolist(),
+        name='OHLC'
+    )])
+    fig.add_trace(go.Bar(
+        x=dates,
+        y=df['Volume'].tolist(),
+        name='Volume',
+        yaxis='y2',
+        marker_color='rgba(200, 200, 200, 0.5)',
+        opacity=0.5
+    ))
+    
+    if previous_close is not None:
+        fig.add_hline(y=previous_close, line_width=1, line_dash="dot", line_color="gray",
+                      annotation_text=f"Prev. close ${previous_close:.2f}", annotation_position="bottom right")
+    
+    fig.update_layout(
+        title=f"{config.STOCK_NAME} Intraday ({interval} bars)",
+        xaxis=dict(
+            rangeslider=dict(visible=False),
+            rangebreaks=[dict(bounds=["sat", "mon"]), dict(bounds=[16, 9.5], pattern="hour")],
+        ),
+        yaxis_title="Price ($)",
+        yaxis2=dict(title="Volume", overlaying="y", side="right", showgrid=False),
+        height=400,
+        margin=dict(l=50, r=50, t=50, b=50),
+        showlegend=False,
+    )
     return fig
 
 @app.callback(
@@ -480,15 +923,22 @@ def update_price_chart(stock_data_dict, vesting_data_dict):
     Input("vesting-data-store", "data")
 )
 def update_vesting_chart(vesting_data_dict):
-    if vesting_data_dict is None or 'date' not in vesting_data_dict:
+    fingerprint = store_codec.fingerprint(vesting_data_dict)
+    if fingerprint is None:
         return go.Figure()
     
+    # The fingerprint covers the payload's exchange rate as well
+    key = ("vesting", fingerprint)
+    exchange_rate = vesting_data_dict.get('exchange_rate', config.CURRENCY_EXCHANGE_RATE)
+    return _cached_figure(key, lambda: _vesting_figure(store_codec.decode_frame(vesting_data_dict), exchange_rate))
+
+def _vesting_figure(vesting_df, exchange_rate):
     # Create DataFrame from vesting data
     df = pd.DataFrame({
-        'Date': pd.to_datetime(vesting_data_dict['date']),
-        'Percentage': vesting_data_dict['percentage'],
-        'Value_USD': vesting_data_dict['value_usd'],
-        'Shares': vesting_data_dict['shares']
+        'Date': vesting_df['date'],
+        'Percentage': vesting_df['percentage'],
+        'Value_USD': vesting_df['value_usd'],
+        'Shares': vesting_df['shares']
     })
     
     # Create figure with dual axis
@@ -500,7 +950,7 @@ def update_vesting_chart(vesting_data_dict):
         y=df['Percentage'],
         name='Vesting %',
         marker_color='rgba(58, 71, 80, 0.6)',
-        text=df['Percentage'].apply(lambda x: f"{x}%"),
+        text=df['Percentage'].apply(lambda x: f"{x:.4g}%"),
         textposition='auto',
     ))
     
@@ -529,9 +979,9 @@ def update_vesting_chart(vesting_data_dict):
     # Add table below the chart with value information
     vesting_info = pd.DataFrame({
         'Date': df['Date'].dt.strftime('%Y-%m-%d'),
-        'Percentage': df['Percentage'].apply(lambda x: f"{x}%"),
+        'Percentage': df['Percentage'].apply(lambda x: f"{x:.4g}%"),
         'USD Value': df['Value_USD'].apply(lambda x: f"${x:,.2f}"),
-        'RMB Value': (df['Value_USD'] * config.CURRENCY_EXCHANGE_RATE).apply(lambda x: f"¥{x:,.2f}"),
+        'RMB Value': (df['Value_USD'] * exchange_rate).apply(lambda x: f"¥{x:,.2f}"),
         'Shares': df['Shares'].apply(lambda x: f"{x:.2f}")
     })
     
@@ -560,27 +1010,33 @@ def update_vesting_chart(vesting_data_dict):
     Input("selling-data-store", "data")
 )
 def update_selling_chart(selling_data_dict):
-    if selling_data_dict is None:
+    fingerprint = store_codec.fingerprint(selling_data_dict)
+    if fingerprint is None:
         return go.Figure()
     
+    # The payload fingerprint identifies the plan version
+    key = ("selling", fingerprint)
+    return _cached_figure(key, lambda: _selling_figure(store_codec.decode_frame(selling_data_dict)))
+
+def _selling_figure(selling_df):
     # Create DataFrame from selling data
     df = pd.DataFrame({
-        'Date': pd.to_datetime(selling_data_dict['date']),
-        'Month': selling_data_dict['month'],
-        'Shares_To_Sell': selling_data_dict['shares_to_sell'],
-        'Cumulative_Shares': selling_data_dict['cumulative_shares'],
-        'Remaining_Shares': selling_data_dict['remaining_shares'],
-        'Percent_Month': selling_data_dict['percent_sold_this_month'],
-        'Percent_Cumulative': selling_data_dict['percent_sold_cumulative'],
-        'Percent_Remaining': selling_data_dict['percent_remaining']
+        'Date': selling_df['date'],
+        'Month': selling_df['month'],
+        'Shares_To_Sell': selling_df['shares_to_sell'],
+        'Cumulative_Shares': selling_df['cumulative_shares'],
+        'Remaining_Shares': selling_df['remaining_shares'],
+        'Percent_Month': selling_df['percent_sold_this_month'],
+        'Percent_Cumulative': selling_df['percent_sold_cumulative'],
+        'Percent_Remaining': selling_df['percent_remaining']
     })
     
     # Add strategy-specific columns
-    if 'price_factor' in selling_data_dict:
-        df['Price_Factor'] = selling_data_dict['price_factor']
+    if 'price_factor' in selling_df.columns:
+        df['Price_Factor'] = selling_df['price_factor']
     
-    if 'period' in selling_data_dict:
-        df['Period'] = selling_data_dict['period']
+    if 'period' in selling_df.columns:
+        df['Period'] = selling_df['period']
     
     # Create figure with dual axis
     fig = go.Figure()
@@ -631,19 +1087,20 @@ def update_selling_chart(selling_data_dict):
     Input("last-price-store", "data")
 )
 def update_selling_table(selling_data_dict, current_price):
-    if selling_data_dict is None:
+    selling_df = store_codec.decode_frame(selling_data_dict)
+    if selling_df is None:
         return [], []
     
     # Create DataFrame from selling data
     df = pd.DataFrame({
-        'Date': pd.to_datetime(selling_data_dict['date']),
-        'Month': selling_data_dict['month'],
-        'Shares_To_Sell': selling_data_dict['shares_to_sell'],
-        'Cumulative_Shares': selling_data_dict['cumulative_shares'],
-        'Remaining_Shares': selling_data_dict['remaining_shares'],
-        'Percent_Month': selling_data_dict['percent_sold_this_month'],
-        'Percent_Cumulative': selling_data_dict['percent_sold_cumulative'],
-        'Percent_Remaining': selling_data_dict['percent_remaining']
+        'Date': selling_df['date'],
+        'Month': selling_df['month'],
+        'Shares_To_Sell': selling_df['shares_to_sell'],
+        'Cumulative_Shares': selling_df['cumulative_shares'],
+        'Remaining_Shares': selling_df['remaining_shares'],
+        'Percent_Month': selling_df['percent_sold_this_month'],
+        'Percent_Cumulative': selling_df['percent_sold_cumulative'],
+        'Percent_Remaining': selling_df['percent_remaining']
     })
     
     # Format data for display
@@ -657,8 +1114,9 @@ def update_selling_table(selling_data_dict, current_price):
     
     # Add estimated value columns if current price is available
     if current_price:
+        exchange_rate = selling_data_dict.get('exchange_rate', config.CURRENCY_EXCHANGE_RATE)
         df['Est_Value_USD'] = df['Shares_To_Sell'] * current_price
-        df['Est_Value_RMB'] = df['Est_Value_USD'] * config.CURRENCY_EXCHANGE_RATE
+        df['Est_Value_RMB'] = df['Est_Value_USD'] * exchange_rate
         
         display_df['Est. Value (USD)'] = df['Est_Value_USD'].apply(lambda x: f"${x:,.2f}")
         display_df['Est. Value (RMB)'] = df['Est_Value_RMB'].apply(lambda x: f"¥{x:,.2f}")
@@ -669,39 +1127,246 @@ def update_selling_table(selling_data_dict, current_price):
     return display_df.to_dict('records'), columns
 
 @app.callback(
-    Output("alerts-section", "children"),
-    Input("interval-component", "n_intervals"),
-    State("last-price-store", "data")
+    Output("comparison-chart", "figure"),
+    Output("comparison-table", "data"),
+    Output("comparison-table", "columns"),
+    Input("tick-history", "data"),
+    Input("tick-price", "data"),
+    Input("tick-config", "data"),
+    Input("url", "pathname")
 )
-def update_alerts(n_intervals, current_price):
-    global last_price
+def update_comparison(history_tick, price_tick, config_tick, pathname):
+    profile = _profile(pathname)
+    snapshot = market_snapshot.get_snapshot()
+    if (profile is None or snapshot.current_price is None
+            or snapshot.history is None or snapshot.history.empty):
+        return go.Figure(), [], []
     
-    if last_price is None or current_price is None:
-        return html.Div()
+    vesting_df = market_snapshot.get_vesting(snapshot, profile)
+    if vesting_df is None:
+        return go.Figure(), [], []
+    matrix = stock_data.calculate_plan_matrix(vesting_df, snapshot.current_price, snapshot.history, profile)
     
-    alerts = stock_data.check_price_alerts(last_price)
+    # Estimated proceeds assume each month's sale happens at the median simulated price
+    outcomes = simulation.get_selling_outcomes(snapshot, profile, vesting_df)
+    median_prices = outcomes['price_fan']['p50'].to_numpy()
+    monthly_proceeds = matrix.shares * median_prices
+    cumulative_proceeds = np.cumsum(monthly_proceeds, axis=1)
+    cumulative_percent = matrix.cumulative_percent
     
-    if not alerts:
-        return html.Div()
+    # Solid lines: cumulative % sold; dotted lines: cumulative estimated proceeds
+    fig = go.Figure()
+    colors = qualitative.Plotly
+    for i, strategy in enumerate(matrix.strategies):
+        name = config.SELLING_STRATEGIES.get(strategy, strategy)
+        color = colors[i % len(colors)]
+        fig.add_trace(go.Scatter(
+            x=matrix.dates,
+            y=cumulative_percent[i],
+            mode='lines',
+            name=name,
+            legendgroup=strategy,
+            line=dict(color=color, width=2),
+        ))
+        fig.add_trace(go.Scatter(
+            x=matrix.dates,
+            y=cumulative_proceeds[i],
+            mode='lines',
+            name=f"{name} (proceeds)",
+            legendgroup=strategy,
+            showlegend=False,
+            line=dict(color=color, width=2, dash='dot'),
+            yaxis='y2',
+        ))
     
-    alert_components = []
-    for alert in alerts:
-        alert_type = alert['type']
-        message = alert['message']
-        change = alert['change']
-        
-        color = "success" if alert_type == "increase" else "danger"
-        
-        alert_components.append(
-            dbc.Alert(
-                message,
-                color=color,
-                dismissable=True,
-                className="mt-3",
-            )
-        )
+    fig.update_layout(
+        title="Cumulative % Sold (solid) and Estimated Proceeds (dotted)",
+        xaxis_title="Date",
+        yaxis=dict(title="Cumulative % Sold", range=[0, 105]),
+        yaxis2=dict(title="Estimated Proceeds ($)", overlaying='y', side='right', showgrid=False),
+        hovermode="x unified",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        height=400,
+        margin=dict(l=50, r=50, t=50, b=50),
+    )
+    
+    total_proceeds = cumulative_proceeds[:, -1]
+    display_df = pd.DataFrame({
+        'Strategy': [config.SELLING_STRATEGIES.get(s, s) for s in matrix.strategies],
+        'Largest Month (Shares)': [f"{x:,.2f}" for x in matrix.shares.max(axis=1)],
+        '50% Sold By': [matrix.dates[np.argmax(row >= 50)].strftime('%Y-%m') for row in cumulative_percent],
+        'At Current Price (USD)': [f"${x:,.0f}" for x in matrix.shares.sum(axis=1) * snapshot.current_price],
+        'Est. Proceeds (USD)': [f"${x:,.0f}" for x in total_proceeds],
+        'Est. Proceeds (RMB)': [f"¥{x:,.0f}" for x in total_proceeds * profile.currency_exchange_rate],
+    })
+    columns = [{"name": col, "id": col} for col in display_df.columns]
     
-    return html.Div(alert_components)
+    return fig, display_df.to_dict('records'), columns
+
+@app.callback(
+    Output("simulation-chart", "figure"),
+    Output("simulation-table", "data"),
+    Output("simulation-table", "columns"),
+    Input("tick-history", "data"),
+    Input("tick-price", "data"),
+    Input("tick-config", "data"),
+    Input("url", "pathname")
+)
+def update_simulation(history_tick, price_tick, config_tick, pathname):
+    profile = _profile(pathname)
+    snapshot = market_snapshot.get_snapshot()
+    if (profile is None or snapshot.current_price is None
+            or snapshot.history is None or snapshot.history.empty):
+        return go.Figure(), [], []
+    
+    outcomes = simulation.get_selling_outcomes(snapshot, profile, market_snapshot.get_vesting(snapshot, profile))
+    price_fan = outcomes['price_fan']
+    months = price_fan.index + 1
+    
+    # Fan chart: 5-95% and 25-75% bands around the median simulated price
+    fig = go.Figure()
+    for low, high, color, name in [("p5", "p95", 'rgba(58, 71, 80, 0.15)', '5-95%'),
+                                   ("p25", "p75", 'rgba(58, 71, 80, 0.3)', '25-75%')]:
+        fig.add_trace(go.Scatter(x=months, y=price_fan[high], mode='lines',
+                                 line=dict(width=0), showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=months, y=price_fan[low], mode='lines', line=dict(width=0),
+                                 fill='tonexty', fillcolor=color, name=name))
+    fig.add_trace(go.Scatter(
+        x=months,
+        y=price_fan['p50'],
+        mode='lines',
+        name='Median',
+        line=dict(color='rgba(0, 128, 0, 0.7)', width=3)
+    ))
+    
+    fig.update_layout(
+        title=f"Simulated {config.STOCK_NAME} Price ({config.SIMULATION_PATHS:,} paths, {config.SIMULATION_METHOD})",
+        xaxis_title="Months from now",
+        yaxis_title="Price ($)",
+        hovermode="x unified",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        height=350,
+        margin=dict(l=50, r=50, t=50, b=50),
+    )
+    
+    proceeds = outcomes['proceeds']
+    display_df = pd.DataFrame({
+        'Strategy': [config.SELLING_STRATEGIES.get(s, s) for s in proceeds.index],
+        'Mean (USD)': proceeds['mean'].apply(lambda x: f"${x:,.0f}"),
+        'Median (USD)': proceeds['p50'].apply(lambda x: f"${x:,.0f}"),
+        '5th Pct (USD)': proceeds['p5'].apply(lambda x: f"${x:,.0f}"),
+        '95th Pct (USD)': proceeds['p95'].apply(lambda x: f"${x:,.0f}"),
+        'Worst Case (USD)': proceeds['worst'].apply(lambda x: f"${x:,.0f}"),
+    })
+    columns = [{"name": col, "id": col} for col in display_df.columns]
+    
+    return fig, display_df.to_dict('records'), columns
+
+@app.callback(
+    Output("backtest-chart", "figure"),
+    Output("backtest-table", "data"),
+    Output("backtest-table", "columns"),
+    Input("tick-history", "data"),
+    Input("tick-plan_price", "data"),
+    Input("tick-config", "data"),
+    Input("url", "pathname")
+)
+def update_backtest(history_tick, plan_price_tick, config_tick, pathname):
+    profile = _profile(pathname)
+    snapshot = market_snapshot.get_snapshot()
+    if profile is None or snapshot.history is None or snapshot.history.empty:
+        return go.Figure(), [], []
+    
+    result = backtest.get_backtest(snapshot, profile, market_snapshot.get_vesting(snapshot, profile))
+    proceeds = result['proceeds']
+    if proceeds.empty:
+        return go.Figure(), [], []
+    
+    # One line per strategy: proceeds if the plan had started on that day,
+    # downsampled with LTTB to the chart point budget
+    lines = store_payloads.get(
+        ("backtest", snapshot.version, profile.vesting_key, profile.plan_key(), config.CHART_MAX_POINTS),
+        lambda: {s: downsample.lttb_series(proceeds[s], config.CHART_MAX_POINTS) for s in proceeds.columns}
+    )
+    fig = go.Figure()
+    for strategy, line in lines.items():
+        fig.add_trace(go.Scatter(
+            x=line.index,
+            y=line,
+            mode='lines',
+            name=config.SELLING_STRATEGIES.get(strategy, strategy),
+        ))
+    
+    fig.update_layout(
+        title=f"Realized Proceeds by Start Date (last {config.BACKTEST_YEARS} years)",
+        xaxis_title="Plan Start Date",
+        yaxis_title="Proceeds ($)",
+        hovermode="x unified",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        height=400,
+        margin=dict(l=50, r=50, t=50, b=50),
+    )
+    
+    summary = result['summary']
+    display_df = pd.DataFrame({
+        'Strategy': [config.SELLING_STRATEGIES.get(s, s) for s in summary.index],
+        'Mean (USD)': summary['mean'].apply(lambda x: f"${x:,.0f}"),
+        'Median (USD)': summary['p50'].apply(lambda x: f"${x:,.0f}"),
+        '5th Pct (USD)': summary['p5'].apply(lambda x: f"${x:,.0f}"),
+        '95th Pct (USD)': summary['p95'].apply(lambda x: f"${x:,.0f}"),
+        'Worst Case (USD)': summary['worst'].apply(lambda x: f"${x:,.0f}"),
+        'Best Case (USD)': summary['best'].apply(lambda x: f"${x:,.0f}"),
+    })
+    columns = [{"name": col, "id": col} for col in display_df.columns]
+    
+    return fig, display_df.to_dict('records'), columns
+
+# Alerts are evaluated once per snapshot by alerts.engine; the section is
+# only re-rendered when the set of active alerts changes, so dismissed
+# alerts stay dismissed
+@app.callback(
+    Output("alerts-section", "children"),
+    Output("alerts-revision", "data"),
+    Input("tick-history", "data"),
+    Input("tick-price", "data"),
+    Input("tick-config", "data"),
+    State("alerts-revision", "data")
+)
+def update_alerts(history_tick, price_tick, config_tick, shown_revision):
+    market_snapshot.get_snapshot()
+    revision, active = alerts.engine.active()
+    if revision == shown_revision:
+        return dash.no_update, dash.no_update
+    
+    alert_components = [
+        dbc.Alert(alert['message'], color=alert['color'], dismissable=True, className="mt-3")
+        for alert in active
+    ]
+    return html.Div(alert_components), revision
+
+@app.callback(
+    Output("upstream-status", "children"),
+    Output("upstream-status", "color"),
+    Output("upstream-status", "title"),
+    Input("tick-upstream", "data")
+)
+def update_upstream_status(upstream_tick):
+    statuses = market_snapshot.get_snapshot().upstream
+    failing = [status for status in statuses if status['stale']]
+    if not failing:
+        return "Data: live", "success", "All upstream fetches are healthy"
+    
+    # Fallback data is cached only until the breaker allows a retry, so the
+    # refresh after that delay fetches again
+    details = "; ".join(
+        f"{status['name']}: {status['state']}, {status['failures']} failures, "
+        + (f"retry in {status['retry_in']:.0f}s" if status['retry_in'] >= 1 else "retry at the next refresh")
+        + f" ({status['last_error']})"
+        for status in failing
+    )
+    if any(status['state'] != "closed" for status in failing):
+        return "Data: stale (upstream down)", "danger", details
+    return "Data: stale (retrying)", "warning", details
 
 # Modal callbacks
 @app.callback(
@@ -717,10 +1382,14 @@ def toggle_modal(n1, n2, is_open):
 # Network info update
 @app.callback(
     Output("network-info", "children"),
-    [Input("interval-component", "n_intervals")]
+    Output("modal-network-url", "children"),
+    Output("modal-network-url", "href"),
+    Output("footer-network-url", "children"),
+    Input("interval-component", "n_intervals")
 )
 def update_network_info(n):
-    return f"Network: {ip_address}:{config.DEFAULT_PORT}"
+    url = f"http://{ip_address}:{config.DEFAULT_PORT}"
+    return f"Network: {ip_address}:{config.DEFAULT_PORT}", url, url, url
 
 if __name__ == "__main__":
     port = config.DEFAULT_PORT
@@ -0,0 +1,93 @@
+// Push market ticks from the server's /stream (Server-Sent Events) into the
+// market-tick store. While the stream is connected the polling interval is
+// disabled; if the stream drops, polling resumes until it reconnects. The
+// server ends every stream after STREAM_MAX_AGE seconds and refuses streams
+// beyond STREAM_MAX_CLIENTS with 503; such a tab polls and tries again later.
+//
+// Polling fetches the same tick from GET /tick. Either way, split() copies
+// each topic of a tick into its tick-<topic> store only when it changed, so
+// callbacks run only for the data they read.
+(function () {
+    function setProps(id, props) {
+        try {
+            window.dash_clientside.set_props(id, props);
+            return true;
+        } catch (e) {
+            // The layout is not rendered yet; its first callbacks load the data
+            return false;
+        }
+    }
+
+    function sameValue(a, b) {
+        return JSON.stringify(a) === JSON.stringify(b);
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        stream: {
+            poll: function () {
+                fetch("/tick", {cache: "no-store"})
+                    .then(function (response) { return response.json(); })
+                    .then(function (tick) { setProps("market-tick", {data: tick}); })
+                    .catch(function () { /* Try again on the next interval */ });
+                return window.dash_clientside.no_update;
+            },
+            split: function (tick) {
+                var current = Array.prototype.slice.call(arguments, 1);
+                var outputs = window.dash_clientside.callback_context.outputs_list;
+                return outputs.map(function (output, i) {
+                    var topic = output.id.replace(/^tick-/, "");
+                    if (!tick || !(topic in tick) || sameValue(tick[topic], current[i])) {
+                        return window.dash_clientside.no_update;
+                    }
+                    return tick[topic];
+                });
+            }
+        }
+    });
+
+    if (!window.EventSource) {
+        return;  // Keep polling
+    }
+
+    var RECONNECT_GRACE = 5000;  // ms a routine reconnect may take before polling resumes
+    var RETRY_CLOSED = 120000;  // ms before a refused stream is tried again
+
+    function connect() {
+        var source = new EventSource("/stream");
+        var pollTimer = null;
+        var streaming = false;
+
+        function stopPolling() {
+            clearTimeout(pollTimer);
+            if (!streaming) {
+                streaming = setProps("interval-component", {disabled: true});
+            }
+        }
+
+        source.onopen = stopPolling;
+        source.onmessage = function (event) {
+            // onopen can fire before the layout exists, so disabling the
+            // interval there may be lost; the first tick disables it again
+            stopPolling();
+            setProps("market-tick", {data: JSON.parse(event.data)});
+        };
+        source.onerror = function () {
+            if (source.readyState === EventSource.CLOSED) {
+                // Refused (e.g. too many open streams): poll, then try again
+                streaming = false;
+                setProps("interval-component", {disabled: false});
+                setTimeout(connect, RETRY_CLOSED);
+                return;
+            }
+            // EventSource reconnects by itself, which is routine when the
+            // server ends a stream; poll only if that takes a while
+            clearTimeout(pollTimer);
+            pollTimer = setTimeout(function () {
+                streaming = false;
+                setProps("interval-component", {disabled: false});
+            }, RECONNECT_GRACE);
+        };
+    }
+
+    window.addEventListener("load", connect);
+})();
@@ -0,0 +1,90 @@
+"""Historical backtests of the selling strategies.
+
+Each strategy's monthly share plan is replayed as if it had been started on
+every trading day of the last BACKTEST_YEARS years. The month-by-month sale
+prices for all start dates come from one strided sliding-window view over
+the daily close series, so a strategy's proceeds for every start date are a
+single matrix-vector product. Large backtests run one strategy per worker on
+the shared process pool.
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+import config
+from simulation import TRADING_DAYS_PER_MONTH, get_process_pool, summarize_proceeds
+
+def window_prices(closes, n_months):
+    """Sale prices for a plan of n_months started on every possible day.
+
+    Returns:
+        Read-only view of shape (start days, n_months) where row i holds the
+        closes at day i, i + 21, i + 42, ... (one sale per trading month)
+    """
+    span = (n_months - 1) * TRADING_DAYS_PER_MONTH + 1
+    return sliding_window_view(np.asarray(closes, dtype=float), span)[:, ::TRADING_DAYS_PER_MONTH]
+
+def _backtest_plan(closes, plan):
+    """Realized proceeds of one plan for every start date."""
+    return window_prices(closes, len(plan)) @ np.asarray(plan, dtype=float)
+
+def backtest_strategies(plans, history, years=None):
+    """Realized proceeds of every strategy for every start date.
+
+    Args:
+        plans: Dict of strategy -> shares to sell each month (equal lengths)
+        history: Daily history with a Close column
+        years: How many years of start dates to test (default config.BACKTEST_YEARS)
+
+    Returns:
+        Dict with 'proceeds': DataFrame of proceeds (USD) indexed by start
+        date with one column per strategy, and 'summary': DataFrame of
+        proceeds statistics per strategy. Both are empty when the history is
+        shorter than one plan.
+    """
+    years = years or config.BACKTEST_YEARS
+    strategies = list(plans)
+    n_months = len(next(iter(plans.values())))
+    span = (n_months - 1) * TRADING_DAYS_PER_MONTH + 1
+
+    # Start dates in the window whose whole plan fits inside the history
+    first_start = history.index.searchsorted(history.index[-1] - pd.DateOffset(years=years))
+    closes = history['Close'].to_numpy(dtype=float)[first_start:]
+    n_starts = len(closes) - span + 1
+    if n_starts <= 0:
+        empty = pd.DataFrame(columns=strategies)
+        return {'proceeds': empty, 'summary': empty}
+
+    if n_starts * n_months * len(strategies) >= config.BACKTEST_PARALLEL_MIN_CELLS:
+        pool = get_process_pool()
+        futures = [pool.submit(_backtest_plan, closes, plans[s]) for s in strategies]
+        columns = [future.result() for future in futures]
+    else:
+        columns = [_backtest_plan(closes, plans[s]) for s in strategies]
+
+    proceeds = np.column_stack(columns)
+    start_dates = history.index[first_start:first_start + n_starts]
+    return {
+        'proceeds': pd.DataFrame(proceeds, index=start_dates, columns=strategies),
+        'summary': summarize_proceeds(proceeds, strategies),
+    }
+
+def get_backtest(snapshot, profile=None, vesting=None):
+    """Backtest of every selling strategy for a market snapshot.
+
+    Results are cached per history content and the profile's vesting and
+    plan settings, so all clients of a profile share one run. vesting is
+    the profile's priced vesting schedule (the snapshot's by default).
+    """
+    import stock_data  # Not needed by the worker processes
+    import profiles
+    profile = profile or profiles.from_config()
+    vesting = snapshot.vesting if vesting is None else vesting
+    history = snapshot.history
+    key = (snapshot.history_key, config.BACKTEST_YEARS,
+           profile.vesting_key, profile.plan_key())
+
+    def run():
+        plans = stock_data.get_strategy_plans(vesting, snapshot.current_price, history, profile)
+        return backtest_strategies(plans, history)
+
+    return stock_data.market_cache.get("backtest", key, run)
@@ -1,4 +1,5 @@
 # Amazon Stock Tracker Configuration
+import os
 
 # RSU Details
 TOTAL_RSU_VALUE_RMB = 2000000  # Total value in RMB
@@ -15,7 +16,10 @@ START_DATE = "2023-07-01"  # Change to your actual start date
 END_DATE = "2025-07-01"    # Change to your actual end date
 
 # Vesting Schedule - adjust as per your actual vesting schedule
-# Format: List of (percentage, date) tuples
+# Format: List of (percentage, date) tuples, where percentage is of
+# TOTAL_RSU_VALUE_RMB, and/or grant dicts that are split into equal monthly
+# or quarterly tranches starting one period after "start", e.g.
+#   {"value_rmb": 500000, "start": "2024-01-01", "years": 4, "frequency": "monthly"}
 VESTING_SCHEDULE = [
     (25, "2023-07-01"),  # 25% vested initially
     (25, "2023-10-01"),  # 25% vested in 3 months
@@ -32,23 +36,141 @@ SELLING_STRATEGIES = {
 }
 DEFAULT_STRATEGY = "equal_distribution"
 RESERVE_PERCENTAGE = 20  # For reserve strategy
+PLAN_CACHE_SIZE = 256  # Computed selling plans kept in memory (about 5 per profile)
+PLAN_PRICE_BUCKET_PCT = 0.5  # Price moves smaller than this reuse the equal_value plan
 
-# Price Alert Thresholds
+# Monte Carlo Simulation of selling outcomes
+SIMULATION_PATHS = 50000  # Number of simulated price paths
+SIMULATION_METHOD = "gbm"  # "gbm" (geometric Brownian motion) or "bootstrap" (historical returns)
+SIMULATION_LOOKBACK = "5y"  # History used to fit the price model
+SIMULATION_SEED = 42  # Keeps results stable between refreshes
+SIMULATION_CHUNK_PATHS = 100000  # Larger runs are split into chunks on a process pool
+SIMULATION_WORKERS = 4  # Processes in the simulation pool
+SIMULATION_FAN_PATHS = 10000  # Paths sampled for the fan chart percentiles
+
+# Historical Backtest of the selling strategies
+BACKTEST_YEARS = 5  # Test every start date in this many past years
+BACKTEST_PARALLEL_MIN_CELLS = 2000000  # start dates x months x strategies before using the process pool
+
+# Technical Indicators (price chart overlays, stock_data.get_indicators)
+SMA_WINDOWS = [20, 50, 200]  # Simple moving averages of the close, in trading days
+EMA_WINDOWS = [12, 26]  # Exponential moving averages of the close
+BOLLINGER_WINDOW = 20
+BOLLINGER_STD = 2  # Band width in standard deviations
+RSI_WINDOW = 14
+DEFAULT_OVERLAYS = ["sma_50", "sma_200"]  # Overlays shown when the dashboard opens
+
+# Intraday Bars (intraday.py)
+# The current session and the ones before it, in a ring buffer of fixed
+# size; each refresh fetches only the bars since the newest stored one.
+# Yahoo serves 1m bars for the last 7 days and 5m bars for the last 60.
+INTRADAY_ENABLED = True
+INTRADAY_INTERVAL = "5m"  # "1m" or "5m"
+INTRADAY_SESSIONS = 5  # Current session plus the 4 before it
+
+# Price Alerts
+# Evaluated once per market refresh against the current price. Each alert
+# fires once when its condition becomes true and stays shown until it clears.
+#   move:     change vs. the close `days` trading days ago, in percent (up/down)
+#   ma_cross: `fast`-day simple moving average crossing the `slow`-day one today
+#   extreme:  new high or low of the last `days` daily closes (252 = 52 weeks)
+#   target:   price at or above a tranche's target, e.g.
+#             {"type": "target", "tranche": "2025-06-15", "price": 250.0}
 PRICE_INCREASE_ALERT = 5  # Alert when price increases by 5%
 PRICE_DECREASE_ALERT = 5  # Alert when price decreases by 5%
+ALERT_RULES = [
+    {"type": "move", "days": 1, "up": PRICE_INCREASE_ALERT, "down": PRICE_DECREASE_ALERT},
+    {"type": "move", "days": 5, "up": 10, "down": 10},
+    {"type": "ma_cross", "fast": 50, "slow": 200},
+    {"type": "extreme", "days": 252},
+]
 
 # Application Settings
 DEBUG_MODE = False  # Set to False in production
 DEFAULT_PORT = 8050
 HOST = "0.0.0.0"  # Allow connections from any IP
 REFRESH_INTERVAL = 60  # Refresh data every 60 seconds
+STREAM_HEARTBEAT = 15  # seconds between keep-alive comments on the /stream push channel
+STREAM_MAX_AGE = 120  # seconds a /stream response stays open before the browser reconnects
+WARM_UP_ON_START = True  # Build the first snapshot and plans from the price store before serving
+STORE_PAYLOAD_CACHE_SIZE = 128  # Encoded browser store payloads kept, per snapshot version and profile
+CHART_MAX_POINTS = 500  # Longer price ranges are resampled to weekly/monthly bars
+FIGURE_CACHE_SIZE = 128  # Pre-rendered vesting/selling figures kept in memory
 
 # Logging Configuration
 LOG_LEVEL = "INFO"  # Options: DEBUG, INFO, WARNING, ERROR, CRITICAL
 
 # Data Retrieval Settings
+# Failed fetches are not retried in place: each upstream path waits an
+# exponentially growing, jittered delay before its next attempt and serves
+# the last good data meanwhile. After MAX_RETRIES consecutive failures its
+# circuit breaker opens and fails fast for BREAKER_RESET_TIMEOUT seconds.
 MAX_RETRIES = 5
-RETRY_DELAY = 5  # seconds between retries
+RETRY_DELAY = 5  # seconds before the first retry, doubled after each failure
+RETRY_MAX_DELAY = 60  # cap on the delay between retries
+BREAKER_RESET_TIMEOUT = 120  # seconds the breaker stays open before probing again
+
+# Market Data Provider
+# "yfinance" fetches live data from Yahoo Finance. "replay" serves fixtures
+# recorded with `python providers.py record AMZN` from REPLAY_DATA_DIR, so
+# the app can run and be load-tested without network access.
+DATA_PROVIDER = "yfinance"
+REPLAY_DATA_DIR = "fixtures"
+REPLAY_LATENCY = 0.0  # seconds added to every replayed call
+REPLAY_ERROR_RATE = 0.0  # fraction of replayed calls that fail (0.0 - 1.0)
+REPLAY_SEED = 42  # makes injected errors repeatable; None for random
+
+# Market Data Cache - seconds each kind of data is reused before refetching
+CACHE_TTL = {
+    "price": 30,     # Today's bar / current price
+    "intraday": 30,  # Intraday bars (delta-synced with the intraday ring)
+    "history": 300,  # Daily price history (delta-synced with the price store)
+    "stats": 3600,   # Ticker info (market cap, P/E, 52-week range, ...)
+    "simulation": 3600,  # Monte Carlo selling outcomes, keyed by price
+    "backtest": 3600,    # Historical strategy backtests, keyed by last bar
+}
+
+# Price Store - daily bars kept on disk so restarts only fetch new bars
+PRICE_STORE_PATH = "data/prices.sqlite"
+
+# Production Serving (python run.py --production, requires gunicorn)
+# Each worker process serves requests on its own threads; with PRELOAD_APP
+# the app is imported once before forking. Workers share fetched market data
+# through SHARED_CACHE_PATH so they do not each hit the upstream.
+WORKERS = 4
+# Threads per worker (run.py --threads sets STOCK_TRACKER_THREADS); every open
+# /stream connection holds one
+THREADS = int(os.environ.get("STOCK_TRACKER_THREADS", 8))
+STREAM_MAX_CLIENTS = max(1, THREADS // 2)  # Open /stream connections per process; further tabs poll
+PRELOAD_APP = True
+SHARED_CACHE_PATH = "data/market_cache.sqlite"
+
+# Profiles - several people's RSUs served from one process (see profiles.py)
+# The RSU settings above are the default profile, served at /. Each
+# <name>.json in RSU_PROFILES_DIR overrides some of them and is served at /<name>.
+RSU_PROFILES_DIR = "profiles"
+PROFILE_CACHE_SIZE = 64  # Priced vesting schedules kept (one per profile and refresh)
+
+# Hot Reload (see config_reload.py)
+# Changes to this file and to the profile files are applied while the app
+# runs, invalidating only the results that read the changed settings.
+# Settings only read at startup (ports, paths, cache sizes, ...) still need
+# a restart; the log says which.
+CONFIG_RELOAD = True
+CONFIG_WATCH_INTERVAL = 2  # seconds between checks for changed files
+
+# Callback Profiling (off by default)
+# STOCK_TRACKER_PROFILE=1 in the environment profiles every Dash callback;
+# otherwise only callback requests sent with PROFILE_HEADER are profiled.
+# Profiles are written to PROFILE_DIR and listed at /admin/profiles.
+# /admin pages and header profiling are limited to requests from this machine
+# or carrying ADMIN_TOKEN (X-Admin-Token header or ?token=).
+PROFILE_CALLBACKS = os.environ.get("STOCK_TRACKER_PROFILE") == "1"
+PROFILE_HEADER = None  # e.g. "X-Profile" to profile requests sent with that header
+ADMIN_TOKEN = os.environ.get("STOCK_TRACKER_ADMIN_TOKEN")  # None: local requests only
+PROFILE_DIR = "data/profiles"
+PROFILE_TOP_N = 20  # Slowest (and most recent) profiles kept
+PROFILE_SAMPLE_INTERVAL = 0.001  # seconds between stack samples for the collapsed stacks
 
 # Proxy Configuration (if needed)
 USE_PROXY = False
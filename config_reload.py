@@ -0,0 +1,183 @@
+"""Hot reload of config.py and the profile files without restarting.
+
+A watcher thread polls the modification times of config.py and the files
+in config.RSU_PROFILES_DIR every CONFIG_WATCH_INTERVAL seconds. A changed
+config.py is executed into a fresh module first; if that fails, or the new RSU
+settings do not validate, the running config is left untouched. Otherwise
+every changed setting is applied to the config module in one update, and
+only the derived results that read those settings are invalidated:
+
+- Settings read on every use (LIVE_KEYS) need nothing: the cache keys of
+  the results they feed include them, or the profile fields built from
+  them (see profiles.VESTING_FIELDS), so results that do not read a changed
+  setting keep hitting their caches.
+- Modules holding state built from other settings register a handler with
+  on_change, e.g. the indicators, the alert engine and the profiler.
+- Any other change (ports, paths, cache sizes, ...) is applied but logged
+  as needing a restart.
+
+Market data (the price store, cached history and snapshots) is never
+dropped by a reload.
+"""
+import importlib.util
+import logging
+import os
+import threading
+import config
+import profiles
+
+# Settings that take effect on their next use without any invalidation
+LIVE_KEYS = {
+    # RSU settings: read through profiles.from_config() on every request
+    "TOTAL_RSU_VALUE_RMB", "CURRENCY_EXCHANGE_RATE", "TOTAL_RSU_VALUE_USD", "VESTING_SCHEDULE",
+    "START_DATE", "END_DATE", "SELLING_TIMEFRAME_MONTHS", "DEFAULT_STRATEGY", "RESERVE_PERCENTAGE",
+    # Part of the plan, simulation, backtest and chart cache keys
+    "PLAN_PRICE_BUCKET_PCT", "SIMULATION_PATHS", "SIMULATION_METHOD", "SIMULATION_LOOKBACK",
+    "SIMULATION_SEED", "SIMULATION_CHUNK_PATHS", "SIMULATION_FAN_PATHS", "BACKTEST_YEARS",
+    "BACKTEST_PARALLEL_MIN_CELLS", "CHART_MAX_POINTS", "STREAM_HEARTBEAT",
+    "STREAM_MAX_AGE", "STREAM_MAX_CLIENTS",
+    "PROFILE_CALLBACKS", "PROFILE_HEADER", "ADMIN_TOKEN",
+    "CONFIG_RELOAD", "CONFIG_WATCH_INTERVAL",
+}
+
+_handlers = []  # (keys, callback)
+_listeners = []
+_lock = threading.Lock()
+revision = 0  # Number of reloads applied, sent to the browsers with every tick
+
+def on_change(keys, callback):
+    """Call callback() after a reload that changes any of the config settings in keys."""
+    _handlers.append((frozenset(keys), callback))
+
+def subscribe(listener):
+    """Call listener(changed settings) after every applied reload."""
+    _listeners.append(listener)
+
+def _settings(module):
+    return {name: value for name, value in vars(module).items() if name.isupper()}
+
+def _load_config(path):
+    """Execute config.py into a new module, leaving the running config alone."""
+    spec = importlib.util.spec_from_file_location("config", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return _settings(module)
+
+def reload_config(path=None):
+    """Apply the current contents of config.py.
+
+    Returns:
+        Sorted list of the settings that changed (empty if the file is
+        invalid or nothing changed)
+    """
+    global revision
+    try:
+        settings = _load_config(path or config.__file__)
+        # Reject invalid RSU settings before any of them is applied
+        profiles.from_config(overrides={key: settings[key] for key in profiles.CONFIG_KEYS.values()
+                                        if key in settings})
+    except Exception as e:
+        logging.error(f"Config reload failed, keeping the running config: {e}")
+        return []
+
+    with _lock:
+        current = _settings(config)
+        changed = {name: value for name, value in settings.items()
+                   if name not in current or current[name] != value}
+        if not changed:
+            return []
+        vars(config).update(changed)
+        revision += 1
+
+    names = sorted(changed)
+    logging.info(f"Config reloaded, changed: {', '.join(names)}")
+    handled = set(LIVE_KEYS)
+    for keys, callback in _handlers:
+        handled |= keys
+        if keys & changed.keys():
+            _run(callback)
+    restart = [name for name in names if name not in handled]
+    if restart:
+        logging.warning(f"Restart to apply: {', '.join(restart)}")
+    _notify(names)
+    return names
+
+def reload_profile_files():
+    """Load the profile files again and tell the listeners."""
+    global revision
+    profiles.reload_profiles()
+    with _lock:
+        revision += 1
+    _notify(["PROFILES"])
+
+def _run(callback):
+    try:
+        callback()
+    except Exception as e:
+        logging.error(f"Config reload handler {getattr(callback, '__name__', callback)} failed: {e}")
+
+def _notify(changed):
+    for listener in _listeners:
+        try:
+            listener(changed)
+        except Exception as e:
+            logging.error(f"Config reload listener failed: {e}")
+
+# Named profiles fill the settings their files leave out from config.py
+on_change(profiles.CONFIG_KEYS.values(), profiles.reload_profiles)
+
+class ConfigWatcher:
+    """Polls config.py and the profile files and reloads whichever changed."""
+
+    def __init__(self, config_path, profiles_dir):
+        self.config_path = config_path
+        self.profiles_dir = profiles_dir
+        self._thread = None
+        self._stop = threading.Event()
+        self._config_mtime = self._mtime(config_path)
+        self._profile_mtimes = self._profile_files()
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _profile_files(self):
+        if not os.path.isdir(self.profiles_dir):
+            return {}
+        return {name: self._mtime(os.path.join(self.profiles_dir, name))
+                for name in os.listdir(self.profiles_dir) if name.endswith(".json")}
+
+    def check(self):
+        """Reload config.py and/or the profiles if their files changed since the last check."""
+        config_mtime = self._mtime(self.config_path)
+        if config_mtime != self._config_mtime:
+            self._config_mtime = config_mtime
+            reload_config(self.config_path)
+        profile_mtimes = self._profile_files()
+        if profile_mtimes != self._profile_mtimes:
+            self._profile_mtimes = profile_mtimes
+            reload_profile_files()
+
+    def start(self):
+        """Start the watcher thread (no-op if running or CONFIG_RELOAD is off)."""
+        if not config.CONFIG_RELOAD or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        # A reload that sets CONFIG_RELOAD = False stops the watcher
+        while config.CONFIG_RELOAD and not self._stop.wait(config.CONFIG_WATCH_INTERVAL):
+            try:
+                self.check()
+            except Exception as e:
+                logging.error(f"Config watcher check failed: {e}")
+
+watcher = ConfigWatcher(config.__file__, config.RSU_PROFILES_DIR)
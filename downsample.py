@@ -0,0 +1,90 @@
+"""Downsampling of chart series to a fixed point budget.
+
+Long price ranges are resampled to weekly, monthly, quarterly or yearly
+candles (whichever is the finest that fits the budget), aggregating each
+bar's open/high/low/close/volume correctly. Line overlays keep their shape
+with Largest-Triangle-Three-Buckets (LTTB), which picks the visually most
+significant point of each bucket instead of averaging peaks away.
+"""
+import numpy as np
+import pandas as pd
+
+# Coarser bar sizes tried in order until the bars fit the budget
+BAR_RULES = [
+    ("weekly", "W-FRI"),
+    ("monthly", "MS"),
+    ("quarterly", "QS"),
+    ("yearly", "YS"),
+]
+
+OHLCV_AGGREGATION = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum',
+}
+
+def resample_ohlcv(bars, rule):
+    """Aggregate daily OHLCV bars into `rule` bars.
+
+    Each bar is labeled with its first trading day, and periods without any
+    trading day are dropped. Other columns (such as indicators) take their
+    value at the bar's close.
+    """
+    columns = {c: OHLCV_AGGREGATION.get(c, 'last') for c in bars.columns}
+    result = bars[list(columns)].resample(rule).agg(columns)
+    first_days = bars.index.to_series().resample(rule).first()
+    result.index = pd.DatetimeIndex(first_days.to_numpy(), name=bars.index.name)
+    result = result[result.index.notna()]
+    return result.astype(bars[list(columns)].dtypes.to_dict())
+
+def downsample_ohlcv(bars, max_points):
+    """Resample daily bars to the finest bar size with at most max_points bars.
+
+    Returns:
+        (bars, label) where label is "daily" when no resampling was needed
+    """
+    if len(bars) <= max_points:
+        return bars, "daily"
+    for label, rule in BAR_RULES:
+        resampled = resample_ohlcv(bars, rule)
+        if len(resampled) <= max_points:
+            return resampled, label
+    return resampled.iloc[-max_points:], label
+
+def lttb(x, y, max_points):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept; the points in between are
+    split into max_points - 2 buckets and from each bucket the point forming
+    the largest triangle with the previously kept point and the average of
+    the next bucket is kept.
+    """
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    x = np.asarray(x).astype(np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    kept = np.empty(max_points, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point after the final bucket)
+        next_start, next_end = (end, edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a])
+                       - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        kept[i + 1] = a
+    return kept
+
+def lttb_series(series, max_points):
+    """Downsample a Series indexed by date (or number) with LTTB."""
+    index = series.index
+    x = index.asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy()
+    return series.iloc[lttb(x, series.to_numpy(), max_points)]
@@ -0,0 +1,161 @@
+"""Technical indicators maintained incrementally over daily bars.
+
+An IndicatorSet keeps every indicator of a symbol's daily history in numpy
+arrays, together with running state (cumulative sums, the previous EMA and
+RSI averages). Each value depends only on the state at the bar before, so
+when history grows by a bar, or today's forming bar changes, only the bars
+from the last one onwards are computed again: O(1) per refresh instead of a
+rolling() pass over the whole series. Periods are then slices of the arrays.
+
+Values during an indicator's warm-up (before it has a full window) are NaN.
+"""
+import numpy as np
+import pandas as pd
+
+class IndicatorSet:
+    """SMA, EMA, Bollinger bands, RSI and VWAP over a growing series of daily bars.
+
+    Columns of frame():
+        sma_<n>, ema_<n>    moving averages of the close for every window
+        bb_upper, bb_lower  SMA +/- bollinger_std sample standard deviations
+        rsi                 Wilder's relative strength index
+        vwap                volume-weighted typical price, anchored at the
+                            first bar of the frame
+    """
+
+    def __init__(self, sma_windows=(20, 50, 200), ema_windows=(12, 26),
+                 bollinger_window=20, bollinger_std=2, rsi_window=14):
+        self.sma_windows = tuple(sma_windows)
+        self.ema_windows = tuple(ema_windows)
+        self.bollinger_window = bollinger_window
+        self.bollinger_std = bollinger_std
+        self.rsi_window = rsi_window
+        self.columns = ([f"sma_{n}" for n in self.sma_windows] + [f"ema_{n}" for n in self.ema_windows]
+                        + ["bb_upper", "bb_lower", "rsi", "vwap"])
+        # Inputs, running state and outputs, all one value per bar
+        self._names = (["close", "typical", "volume", "cum_close", "cum_close_sq", "cum_pv", "cum_volume",
+                        "avg_gain", "avg_loss"] + [f"_ema_{n}" for n in self.ema_windows] + self.columns)
+        self.length = 0
+        self.dates = np.empty(0, dtype="datetime64[ns]")
+        self._arrays = {name: np.empty(0) for name in self._names}
+
+    def update(self, history):
+        """Bring the indicators up to date with history (daily OHLCV bars).
+
+        Bars before the last stored one are final; if they still match,
+        only the last stored bar and newer ones are computed. Otherwise
+        (history re-adjusted or replaced) everything is computed again.
+        """
+        length = len(history)
+        if length == 0:
+            self.length = 0
+            return
+        dates = history.index.to_numpy()
+        closes = history['Close'].to_numpy(dtype=np.float64)
+        start = 0
+        final = self.length - 2  # Newest stored bar that cannot have changed
+        if final >= 0 and length >= self.length and dates[final] == self.dates[final] \
+                and closes[final] == self._arrays['close'][final]:
+            start = self.length - 1
+
+        self._reserve(length)
+        self.dates[start:length] = dates[start:]
+        arrays = self._arrays
+        arrays['close'][start:length] = closes[start:]
+        arrays['typical'][start:length] = (
+            history['High'].to_numpy(dtype=np.float64)[start:]
+            + history['Low'].to_numpy(dtype=np.float64)[start:] + closes[start:]
+        ) / 3
+        arrays['volume'][start:length] = history['Volume'].to_numpy(dtype=np.float64)[start:]
+        for i in range(start, length):
+            self._compute(i)
+        self.length = length
+
+    def _reserve(self, length):
+        capacity = len(self.dates)
+        if length <= capacity:
+            return
+        capacity = max(length, 2 * capacity, 256)
+        dates = np.empty(capacity, dtype="datetime64[ns]")
+        dates[:self.length] = self.dates[:self.length]
+        self.dates = dates
+        for name, values in self._arrays.items():
+            grown = np.full(capacity, np.nan)
+            grown[:self.length] = values[:self.length]
+            self._arrays[name] = grown
+
+    def _compute(self, i):
+        """Compute every indicator at bar i from the state at bar i - 1."""
+        a = self._arrays
+        close = a['close'][i]
+        if i == 0:
+            a['cum_close'][0] = close
+            a['cum_close_sq'][0] = close * close
+            a['cum_pv'][0] = a['typical'][0] * a['volume'][0]
+            a['cum_volume'][0] = a['volume'][0]
+        else:
+            a['cum_close'][i] = a['cum_close'][i - 1] + close
+            a['cum_close_sq'][i] = a['cum_close_sq'][i - 1] + close * close
+            a['cum_pv'][i] = a['cum_pv'][i - 1] + a['typical'][i] * a['volume'][i]
+            a['cum_volume'][i] = a['cum_volume'][i - 1] + a['volume'][i]
+
+        for n in self.sma_windows:
+            a[f"sma_{n}"][i] = self._window_sum('cum_close', i, n) / n if i >= n - 1 else np.nan
+
+        for n in self.ema_windows:
+            previous = a[f"_ema_{n}"][i - 1] if i else close
+            ema = previous + 2 / (n + 1) * (close - previous)
+            a[f"_ema_{n}"][i] = ema
+            a[f"ema_{n}"][i] = ema if i >= n - 1 else np.nan
+
+        n = self.bollinger_window
+        if i >= n - 1:
+            total = self._window_sum('cum_close', i, n)
+            variance = max(self._window_sum('cum_close_sq', i, n) - total * total / n, 0.0) / (n - 1)
+            spread = self.bollinger_std * variance ** 0.5
+            a['bb_upper'][i] = total / n + spread
+            a['bb_lower'][i] = total / n - spread
+        else:
+            a['bb_upper'][i] = a['bb_lower'][i] = np.nan
+
+        # Wilder's smoothing, seeded with the plain average of the first n changes
+        n = self.rsi_window
+        if i == 0:
+            a['avg_gain'][0] = a['avg_loss'][0] = 0.0
+            a['rsi'][0] = np.nan
+            return
+        change = close - a['close'][i - 1]
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        weight = min(i, n)
+        a['avg_gain'][i] = (a['avg_gain'][i - 1] * (weight - 1) + gain) / weight
+        a['avg_loss'][i] = (a['avg_loss'][i - 1] * (weight - 1) + loss) / weight
+        if i < n:
+            a['rsi'][i] = np.nan
+        elif a['avg_loss'][i] == 0:
+            a['rsi'][i] = 100.0
+        else:
+            a['rsi'][i] = 100 - 100 / (1 + a['avg_gain'][i] / a['avg_loss'][i])
+
+    def _window_sum(self, cumulative, i, n):
+        values = self._arrays[cumulative]
+        return values[i] - (values[i - n] if i >= n else 0.0)
+
+    def frame(self, start=0, columns=None):
+        """Indicators of bars start onwards as a DataFrame indexed by date.
+
+        VWAP is anchored at the first bar of the frame.
+        """
+        columns = self.columns if columns is None else list(columns)
+        end = self.length
+        start = min(max(start, 0), end)
+        a = self._arrays
+        data = {}
+        for column in columns:
+            if column == "vwap":
+                base_pv = a['cum_pv'][start - 1] if start else 0.0
+                base_volume = a['cum_volume'][start - 1] if start else 0.0
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    data[column] = (a['cum_pv'][start:end] - base_pv) / (a['cum_volume'][start:end] - base_volume)
+            else:
+                data[column] = a[column][start:end].copy()
+        return pd.DataFrame(data, index=pd.DatetimeIndex(self.dates[start:end], name='Date'), columns=columns)
@@ -0,0 +1,137 @@
+"""Intraday bars kept in a fixed-size ring buffer.
+
+An IntradayRing holds the minute bars of the current session and the few
+before it in preallocated numpy arrays. New bars overwrite the oldest ones
+once the ring is full, so memory stays the same however long the process
+runs, and merging a delta fetch touches only the bars it contains.
+"""
+import threading
+import numpy as np
+import pandas as pd
+from price_store import OHLCV_COLUMNS
+from providers import MARKET_TIMEZONE
+
+# Minutes per bar of the intervals Yahoo serves, and of a regular session
+INTERVAL_MINUTES = {"1m": 1, "2m": 2, "5m": 5, "15m": 15}
+SESSION_MINUTES = 390
+
+# How far back Yahoo serves each interval, in calendar days
+INTERVAL_MAX_DAYS = {"1m": 7, "2m": 60, "5m": 60, "15m": 60}
+
+def ring_capacity(interval, sessions):
+    """Bars needed for `sessions` regular sessions of `interval` bars."""
+    return sessions * SESSION_MINUTES // INTERVAL_MINUTES[interval]
+
+class IntradayRing:
+    """The newest `capacity` intraday OHLCV bars, oldest overwritten first."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.int64)  # UTC nanoseconds
+        self.values = np.zeros((capacity, len(OHLCV_COLUMNS)))
+        self.start = 0  # Slot of the oldest bar
+        self.count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        return self.timestamps.nbytes + self.values.nbytes
+
+    def _slots(self, positions):
+        """Ring slots of logical positions (0 = oldest bar)."""
+        return (self.start + np.asarray(positions)) % self.capacity
+
+    def clear(self):
+        """Drop every bar."""
+        with self._lock:
+            self.start = 0
+            self.count = 0
+
+    def last_timestamp(self):
+        """Timestamp of the newest bar, or None when empty."""
+        with self._lock:
+            if not self.count:
+                return None
+            return pd.Timestamp(int(self.timestamps[self._slots(self.count - 1)]), tz="UTC")
+
+    def merge(self, bars):
+        """Write bars (OHLCV indexed by timestamp) into the ring.
+
+        Bars newer than the newest stored one are appended; bars with the
+        timestamp of a stored bar replace it (e.g. the still forming last
+        bar). Older bars that are not stored are ignored.
+
+        Returns:
+            Number of bars appended
+        """
+        bars = bars.dropna(subset=['Close'])
+        if bars.empty:
+            return 0
+        index = pd.DatetimeIndex(bars.index)
+        if index.tz is None:
+            index = index.tz_localize(MARKET_TIMEZONE)
+        timestamps = index.tz_convert("UTC").as_unit("ns").asi8
+        order = np.argsort(timestamps, kind="stable")
+        timestamps = timestamps[order]
+        values = bars[OHLCV_COLUMNS].to_numpy(dtype=np.float64)[order]
+
+        with self._lock:
+            if self.count:
+                stored = self.timestamps[self._slots(np.arange(self.count))]
+                newer = timestamps > stored[-1]
+                # Stored timestamps are sorted, so existing bars are found by binary search
+                older, older_values = timestamps[~newer], values[~newer]
+                positions = np.searchsorted(stored, older)
+                found = positions < self.count
+                found[found] = stored[positions[found]] == older[found]
+                self.values[self._slots(positions[found])] = older_values[found]
+                timestamps, values = timestamps[newer], values[newer]
+            # Only the newest `capacity` bars of a large fetch can be kept
+            timestamps, values = timestamps[-self.capacity:], values[-self.capacity:]
+            appended = len(timestamps)
+            if appended:
+                slots = self._slots(self.count + np.arange(appended))
+                self.timestamps[slots] = timestamps
+                self.values[slots] = values
+                overflow = max(self.count + appended - self.capacity, 0)
+                self.start = (self.start + overflow) % self.capacity
+                self.count = min(self.count + appended, self.capacity)
+            return appended
+
+    def frame(self, sessions=None):
+        """Bars oldest first as a DataFrame indexed by market-time timestamp.
+
+        sessions limits the frame to that many of the newest sessions.
+        """
+        with self._lock:
+            slots = self._slots(np.arange(self.count))
+            timestamps = self.timestamps[slots]
+            values = self.values[slots]
+        index = pd.DatetimeIndex(pd.to_datetime(timestamps, utc=True).tz_convert(MARKET_TIMEZONE), name='Date')
+        bars = pd.DataFrame(values, index=index, columns=OHLCV_COLUMNS)
+        if sessions is not None and not bars.empty:
+            days = index.normalize()
+            bars = bars[days >= days.unique()[-sessions:][0]]
+        return bars
+
+def session_bar(bars):
+    """The newest session of intraday bars as one daily OHLCV bar (a one-row DataFrame)."""
+    if bars.empty:
+        return bars
+    days = bars.index.normalize()
+    session = bars[days == days[-1]]
+    return pd.DataFrame({
+        'Open': [session['Open'].iloc[0]],
+        'High': [session['High'].max()],
+        'Low': [session['Low'].min()],
+        'Close': [session['Close'].iloc[-1]],
+        'Volume': [session['Volume'].sum()],
+    }, index=pd.DatetimeIndex([days[-1]], name='Date'))
+
+def previous_close(bars):
+    """Last close of the session before the newest one, or None."""
+    if bars.empty:
+        return None
+    days = bars.index.normalize()
+    earlier = bars['Close'][days < days[-1]]
+    return float(earlier.iloc[-1]) if len(earlier) else None
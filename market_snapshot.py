@@ -0,0 +1,213 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime
+import pandas as pd
+import config
+import store_codec
+import intraday
+import profiles
+import stock_data
+import config_reload
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """Everything the dashboard shows about the market at one point in time.
+
+    Snapshots are never modified after they are built; the DataFrames and dict
+    they hold are shared by every callback and must be treated as read-only.
+    """
+    version: int
+    created_at: datetime
+    symbol: str
+    current_price: float = None
+    today: pd.DataFrame = None      # Today's intraday bar (open so far, last price)
+    intraday: pd.DataFrame = None   # Intraday bars of the current and recent sessions
+    previous_close: float = None    # Close of the session before today's, when known
+    history: pd.DataFrame = None    # Every stored daily bar, sliced per period by readers
+    history_key: str = None         # Content fingerprint of history, changes when any bar does
+    stats: dict = None
+    vesting: pd.DataFrame = None    # Vesting schedule with share counts and vesting prices
+    vesting_key: str = None         # profile.vesting_key of the config.py profile vesting was built for
+    upstream: tuple = ()            # Circuit breaker status per fetch path at build time
+
+class SnapshotRefresher:
+    """Builds a new MarketSnapshot every REFRESH_INTERVAL on a background thread.
+
+    Independent pieces (intraday bars, history, stats) are fetched in
+    parallel on a small thread pool; today's bar is the newest session of the
+    intraday bars (or a separate fetch when intraday bars are off or
+    unavailable), and vesting prices are derived from the history once it
+    arrives. If a piece fails, the value from the previous snapshot is kept.
+    Upstream load therefore depends only on the refresh interval, not on how
+    many clients are reading the snapshot.
+    """
+
+    def __init__(self, symbol=config.STOCK_SYMBOL, interval=config.REFRESH_INTERVAL, max_workers=4):
+        self.symbol = symbol
+        self.interval = interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="snapshot")
+        self._latest = None
+        self._build_lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._listeners = []
+
+    def latest(self):
+        """Return the newest snapshot, building the first one if none exists yet."""
+        snapshot = self._latest
+        if snapshot is None:
+            with self._build_lock:  # Wait for a build already in progress
+                snapshot = self._latest or self.refresh()
+        return snapshot
+
+    def refresh(self):
+        """Build a new snapshot now and publish it."""
+        with self._build_lock:
+            previous = self._latest or MarketSnapshot(0, datetime.now(), self.symbol)
+
+            if config.INTRADAY_ENABLED:
+                bars = self._executor.submit(stock_data.get_intraday_data, self.symbol)
+            history = self._executor.submit(stock_data.get_historical_data, self.symbol, "max")
+            stats = self._executor.submit(stock_data.get_stock_stats)
+
+            pieces = {'intraday': None, 'previous_close': None}
+            if config.INTRADAY_ENABLED:
+                pieces['intraday'] = self._result(bars, 'intraday', previous.intraday)
+            if pieces['intraday'] is not None and not pieces['intraday'].empty:
+                pieces['today'] = intraday.session_bar(pieces['intraday'])
+                pieces['previous_close'] = intraday.previous_close(pieces['intraday'])
+            else:
+                today = self._executor.submit(stock_data.get_today_data, self.symbol)
+                pieces['today'] = self._result(today, 'today', previous.today)
+            pieces['history'] = self._result(history, 'history', previous.history)
+            pieces['history_key'] = (previous.history_key if pieces['history'] is previous.history
+                                     else store_codec.frame_fingerprint(pieces['history']))
+            pieces['stats'] = self._result(stats, 'stats', previous.stats)
+            profile = profiles.from_config()
+            vesting = self._executor.submit(stock_data.calculate_shares_from_vesting, pieces['history'], profile)
+            pieces['vesting'] = self._result(vesting, 'vesting', previous.vesting)
+            pieces['vesting_key'] = (previous.vesting_key if pieces['vesting'] is previous.vesting
+                                     else profile.vesting_key)
+
+            today_data = pieces['today']
+            if today_data is not None and not today_data.empty:
+                pieces['current_price'] = today_data['Close'].iloc[-1]
+
+            self._latest = replace(
+                previous,
+                version=previous.version + 1,
+                created_at=datetime.now(),
+                upstream=tuple(stock_data.upstream_status()),
+                **pieces
+            )
+            for listener in self._listeners:
+                try:
+                    listener(self._latest)
+                except Exception as e:
+                    logging.error(f"Snapshot listener failed: {e}")
+            return self._latest
+
+    def warm_up(self):
+        """Publish a first snapshot built from the price store, without network access.
+
+        Fills the history, vesting and selling plan caches so the first page
+        load does not wait on upstream fetches; the refresher replaces the
+        snapshot with live data on its first run. Returns the snapshot, or
+        None if the store has no bars yet.
+        """
+        with self._build_lock:
+            if self._latest is not None:
+                return self._latest
+            history = stock_data.price_store.load(self.symbol)
+            if history.empty:
+                return None
+            current_price = history['Close'].iloc[-1]
+            profile = profiles.from_config()
+            vesting = stock_data.calculate_shares_from_vesting(history, profile)
+            for strategy in config.SELLING_STRATEGIES:
+                stock_data.calculate_selling_strategy(strategy, vesting, current_price, history, profile)
+            self._latest = MarketSnapshot(
+                version=1,
+                created_at=datetime.now(),
+                symbol=self.symbol,
+                current_price=current_price,
+                today=history.iloc[-1:],  # Last stored bar, as when today's fetch fails
+                history=history,
+                history_key=store_codec.frame_fingerprint(history),
+                vesting=vesting,
+                vesting_key=profile.vesting_key,
+            )
+            return self._latest
+
+    def subscribe(self, listener):
+        """Call listener(snapshot) with every snapshot published from now on."""
+        self._listeners.append(listener)
+
+    @staticmethod
+    def _result(future, name, fallback):
+        try:
+            value = future.result()
+        except Exception as e:
+            logging.error(f"Snapshot refresh of {name} failed: {e}")
+            return fallback
+        if stock_data.is_empty(value) and fallback is not None:
+            return fallback
+        return value
+
+    def start(self):
+        """Start the background refresh thread (no-op if already running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="snapshot-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                snapshot = self.refresh()
+                logging.info(f"Market snapshot v{snapshot.version} built in {time.monotonic() - started:.2f}s")
+            except Exception as e:
+                logging.error(f"Market snapshot refresh failed: {e}")
+            self._stop.wait(max(0, self.interval - (time.monotonic() - started)))
+
+# Shared by every callback and every client of this process
+refresher = SnapshotRefresher()
+
+# Vesting schedules of named profiles priced per snapshot, so every page view
+# of a profile within one refresh shares one computation
+_profile_vesting = stock_data.PlanCache(config.PROFILE_CACHE_SIZE, name="profile_vesting")
+
+def get_vesting(snapshot, profile):
+    """Return profile's vesting schedule priced with the snapshot's history.
+
+    The snapshot carries the vesting of the config.py profile, which every
+    profile with the same vesting settings shares, until a config reload
+    changes them.
+    """
+    if profile.vesting_key == snapshot.vesting_key:
+        return snapshot.vesting
+    if snapshot.history is None or snapshot.history.empty:
+        return None
+    return _profile_vesting.get(
+        (profile.vesting_key, snapshot.version),
+        lambda: stock_data.calculate_shares_from_vesting(snapshot.history, profile)
+    )
+
+def _reload_interval():
+    refresher.interval = config.REFRESH_INTERVAL
+
+config_reload.on_change(["REFRESH_INTERVAL"], _reload_interval)
+
+def get_snapshot():
+    """Return the latest market snapshot, starting the refresher and config watcher on first use."""
+    refresher.start()
+    config_reload.watcher.start()
+    return refresher.latest()
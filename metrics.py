@@ -0,0 +1,285 @@
+"""In-process metrics exposed at /metrics in the Prometheus text format.
+
+Counters and histograms are plain dicts behind a lock, so recording a value
+costs a dict lookup and an addition and can stay on in production. Each
+worker process records into its own registry. With several workers behind
+one port (see use_shared_store), every worker also writes its totals to a
+SQLite file, and /metrics reports the sum over all workers, whichever one
+serves the scrape.
+"""
+import bisect
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    """Monotonic count per label combination."""
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels.get(n, "") for n in self.labelnames), 0)
+
+    def snapshot(self):
+        """Copy of the current values, label values -> count."""
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self, values):
+        for key, value in values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+
+class Histogram:
+    """Bucketed distribution (count, sum and cumulative buckets) per label combination."""
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # key -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, **labels):
+        """Context manager observing the seconds its block takes."""
+        return _Timer(self, labels)
+
+    def snapshot(self):
+        """Copy of the current series, label values -> [bucket counts..., +Inf count, sum]."""
+        with self._lock:
+            return {key: list(series) for key, series in self._series.items()}
+
+    def samples(self, values):
+        for key, series in values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [("le", bound)])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {series[-1]}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+class Registry:
+    """Every metric of the process, rendered together for /metrics."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def snapshot(self):
+        """Current values of every metric, by metric name."""
+        return {metric.name: metric.snapshot() for metric in self._metrics}
+
+    def render(self, snapshot=None):
+        """Text exposition of snapshot (by default this process's current values)."""
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples(snapshot.get(metric.name, {})))
+        return "\n".join(lines) + "\n"
+
+def merge_snapshots(snapshots):
+    """Sum registry snapshots: counters add up, histogram series element-wise."""
+    total = {}
+    for snapshot in snapshots:
+        for name, values in snapshot.items():
+            merged = total.setdefault(name, {})
+            for key, value in values.items():
+                if key not in merged:
+                    merged[key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    merged[key] = [a + b for a, b in zip(merged[key], value)]
+                else:
+                    merged[key] += value
+    return total
+
+class SharedStore:
+    """Registry snapshots of every worker process in a SQLite file.
+
+    Each worker replaces its own row every flush_interval seconds and right
+    before it serves a scrape, so totals lag by at most flush_interval for
+    the other workers. Rows of workers that exited are kept, so counters do
+    not drop when gunicorn replaces a worker; clear() starts over.
+    """
+
+    def __init__(self, path, flush_interval=5):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._pid = None
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS metric_snapshots (
+                pid INTEGER PRIMARY KEY, updated REAL NOT NULL, data BLOB NOT NULL)""")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM metric_snapshots")
+
+    def flush(self, registry):
+        """Write this process's current values."""
+        data = pickle.dumps(registry.snapshot(), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO metric_snapshots VALUES (?, ?, ?)",
+                         (os.getpid(), time.time(), data))
+
+    def totals(self, registry):
+        """Sum of the values of every worker, this one up to date."""
+        self.flush(registry)
+        with self._connect() as conn:
+            rows = conn.execute("SELECT data FROM metric_snapshots").fetchall()
+        return merge_snapshots(pickle.loads(data) for (data,) in rows)
+
+    def start(self, registry):
+        """Start flushing in the background (once per process, as threads do not survive a fork)."""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        threading.Thread(target=self._run, args=(registry,), name="metrics-flush", daemon=True).start()
+
+    def _run(self, registry):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush(registry)
+            except sqlite3.Error as e:
+                logging.warning(f"Could not share metrics: {e}")
+
+registry = Registry()
+shared_store = None
+
+def use_shared_store(path):
+    """Report the totals of all worker processes at /metrics, through a SQLite file.
+
+    Call once before the workers fork; values of an earlier run are dropped.
+    """
+    global shared_store
+    shared_store = SharedStore(path)
+    shared_store.clear()
+
+# Dash callbacks, labeled by their output ids
+CALLBACK_SECONDS = registry.histogram(
+    "dash_callback_duration_seconds", "Time to serve a Dash callback request.", ["callback"])
+CALLBACK_BYTES = registry.histogram(
+    "dash_callback_response_bytes", "Size of Dash callback responses.", ["callback"], SIZE_BUCKETS)
+
+# Upstream market data fetches, labeled by the stock_data function they serve
+UPSTREAM_REQUESTS = registry.counter(
+    "upstream_requests_total", "Upstream fetches by outcome (success, failure, skipped by the circuit breaker).",
+    ["function", "outcome"])
+UPSTREAM_SECONDS = registry.histogram(
+    "upstream_request_duration_seconds", "Time spent in upstream fetches.", ["function"])
+UPSTREAM_RETRIES = registry.counter(
+    "upstream_retries_total", "Upstream fetches attempted after a failure.", ["function"])
+
+# Caches
+MARKET_CACHE_REQUESTS = registry.counter(
+    "market_cache_requests_total",
+    "Market data cache lookups by result (hit, miss, or wait for another thread's load).",
+    ["kind", "result"])
+MEMO_CACHE_REQUESTS = registry.counter(
+    "memo_cache_requests_total", "Plan, store payload and figure cache lookups by result.",
+    ["cache", "result"])
+
+# Alerts
+ALERTS_FIRED = registry.counter(
+    "alerts_fired_total", "Price alerts fired by the alert engine.", ["rule"])
+
+# Push channel
+STREAM_CLIENTS = registry.counter(
+    "stream_connections_total", "Connections opened to the /stream push channel.")
+STREAM_EVENT_BYTES = registry.histogram(
+    "stream_event_bytes", "Size of ticks pushed over /stream.", (), SIZE_BUCKETS)
+
+def register(server):
+    """Instrument Dash callback requests and add GET /metrics to the Flask server."""
+    from flask import Response, g, request
+
+    @server.before_request
+    def _start_timer():
+        if shared_store is not None:
+            shared_store.start(registry)
+        g.metrics_started = time.perf_counter()
+
+    @server.after_request
+    def _record_callback(response):
+        if request.path.endswith("/_dash-update-component") and "metrics_started" in g:
+            body = request.get_json(silent=True) or {}
+            callback = str(body.get("output", "unknown")).strip(".")
+            CALLBACK_SECONDS.observe(time.perf_counter() - g.metrics_started, callback=callback)
+            CALLBACK_BYTES.observe(response.calculate_content_length() or 0, callback=callback)
+        return response
+
+    @server.route("/metrics")
+    def metrics():
+        snapshot = None if shared_store is None else shared_store.totals(registry)
+        return Response(registry.render(snapshot), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,117 @@
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+import pandas as pd
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+def normalize_bars(df):
+    """Reduce a Yahoo Finance history frame to OHLCV indexed by naive dates."""
+    bars = df[OHLCV_COLUMNS].copy()
+    index = pd.DatetimeIndex(bars.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    bars.index = index.normalize()
+    bars.index.name = 'Date'
+    return bars[~bars.index.duplicated(keep='last')].sort_index()
+
+def slice_period(hist_data, period):
+    """Return the trailing part of daily history covered by a Yahoo period string."""
+    if hist_data.empty or period == "max":
+        return hist_data
+    last_date = hist_data.index[-1]
+    if period == "ytd":
+        return hist_data[hist_data.index >= pd.Timestamp(year=last_date.year, month=1, day=1, tz=last_date.tz)]
+    if period.endswith("mo"):
+        offset = pd.DateOffset(months=int(period[:-2]))
+    elif period.endswith("y"):
+        offset = pd.DateOffset(years=int(period[:-1]))
+    else:
+        return hist_data.iloc[-int(period[:-1]):]  # 1d, 5d: trading days
+    return hist_data[hist_data.index > last_date - offset]
+
+class PriceStore:
+    """On-disk store of daily OHLCV bars, one SQLite table per symbol.
+
+    Bars are keyed by trading date, so writing a bar that already exists
+    replaces it. This lets callers append a delta fetch that overlaps the
+    last stored (possibly still forming) bar.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _table(symbol):
+        return 'bars_' + re.sub(r'\W', '_', symbol.upper())
+
+    def _ensure_table(self, conn, symbol):
+        conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{self._table(symbol)}" ('
+            'date TEXT PRIMARY KEY, open REAL, high REAL, low REAL, '
+            'close REAL, volume INTEGER)'
+        )
+
+    def load(self, symbol):
+        """Return every stored bar for symbol, oldest first (may be empty)."""
+        with self._connect() as conn:
+            self._ensure_table(conn, symbol)
+            rows = conn.execute(
+                f'SELECT date, open, high, low, close, volume '
+                f'FROM "{self._table(symbol)}" ORDER BY date'
+            ).fetchall()
+        df = pd.DataFrame(rows, columns=['Date'] + OHLCV_COLUMNS)
+        df.index = pd.DatetimeIndex(pd.to_datetime(df.pop('Date')), name='Date')
+        return df
+
+    def last_date(self, symbol):
+        """Return the date of the newest stored bar, or None if there are none."""
+        with self._connect() as conn:
+            self._ensure_table(conn, symbol)
+            (last,) = conn.execute(f'SELECT MAX(date) FROM "{self._table(symbol)}"').fetchone()
+        return pd.Timestamp(last) if last else None
+
+    def _write(self, conn, symbol, df):
+        bars = normalize_bars(df)
+        rows = list(zip(
+            bars.index.strftime('%Y-%m-%d'),
+            bars['Open'].astype(float), bars['High'].astype(float),
+            bars['Low'].astype(float), bars['Close'].astype(float),
+            bars['Volume'].astype('int64').tolist(),
+        ))
+        self._ensure_table(conn, symbol)
+        conn.executemany(
+            f'INSERT OR REPLACE INTO "{self._table(symbol)}" VALUES (?, ?, ?, ?, ?, ?)',
+            rows
+        )
+
+    def upsert(self, symbol, df):
+        """Insert or replace the bars in df (a Yahoo Finance history frame)."""
+        with self._lock, self._connect() as conn:
+            self._write(conn, symbol, df)
+
+    def replace(self, symbol, df):
+        """Drop everything stored for symbol and store df instead.
+
+        Both happen in one transaction, so readers (and other workers) see
+        either the old bars or the new ones, never an empty table.
+        """
+        with self._lock, self._connect() as conn:
+            self._ensure_table(conn, symbol)
+            conn.execute(f'DELETE FROM "{self._table(symbol)}"')
+            self._write(conn, symbol, df)
@@ -0,0 +1,227 @@
+"""Opt-in profiling of Dash callback requests.
+
+When profiling is on for a request (config.PROFILE_CALLBACKS, or the
+config.PROFILE_HEADER header on that request), its callback dispatch runs
+under cProfile while a sampler thread records its call stacks. Each
+profile is written to config.PROFILE_DIR twice:
+
+- <name>.prof: pstats data, e.g. `python -m pstats <file>` or snakeviz
+- <name>.collapsed: sampled stacks in the collapsed format read by
+  flamegraph.pl and speedscope
+
+Only the files of the PROFILE_TOP_N slowest and PROFILE_TOP_N most recent
+profiles are kept. GET /admin/profiles lists both with their hottest
+functions. cProfile supports one active profile per process, so callbacks
+that overlap a profiled one run unprofiled.
+
+The /admin pages and header profiling answer only requests from this
+machine or ones carrying config.ADMIN_TOKEN.
+"""
+import cProfile
+import hmac
+import heapq
+import html
+import itertools
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+import config
+import config_reload
+
+class _StackSampler(threading.Thread):
+    """Counts the call stacks of one thread, sampled every interval seconds."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        return self.stacks
+
+def _hottest_functions(profile, count=5):
+    """The functions with the most own time in a profile, as display strings."""
+    rows = sorted(pstats.Stats(profile).stats.items(), key=lambda item: item[1][2], reverse=True)
+    return [f"{tottime * 1000:.1f} ms  {func[2]} ({os.path.basename(func[0])}:{func[1]})"
+            for (func, (_, _, tottime, _, _)) in rows[:count]]
+
+class CallbackProfiler:
+    """Profiles callback dispatches and keeps the slowest and latest profiles."""
+
+    def __init__(self, directory, top_n=20, sample_interval=0.001):
+        self.directory = directory
+        self.top_n = top_n
+        self.sample_interval = sample_interval
+        self._slowest = []  # min-heap of (seconds, sequence, entry)
+        self._recent = deque()
+        self._sequence = itertools.count()
+        self._busy = threading.Lock()  # one cProfile at a time
+        self._lock = threading.Lock()
+
+    def profile(self, callback, dispatch):
+        """Return dispatch(), profiling it unless another profile is running."""
+        if not self._busy.acquire(blocking=False):
+            return dispatch()
+        try:
+            sampler = _StackSampler(threading.get_ident(), self.sample_interval)
+            profile = cProfile.Profile()
+            sampler.start()
+            started = time.perf_counter()
+            profile.enable()
+            try:
+                return dispatch()
+            finally:
+                profile.disable()
+                seconds = time.perf_counter() - started
+                try:
+                    self._save(callback, seconds, profile, sampler.stop())
+                except OSError as e:
+                    logging.warning(f"Could not save profile of {callback}: {e}")
+        finally:
+            self._busy.release()
+
+    def _save(self, callback, seconds, profile, stacks):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        name = f"{stamp}-{re.sub(r'[^A-Za-z0-9_-]+', '_', callback)}"
+        profile.dump_stats(os.path.join(self.directory, name + ".prof"))
+        with open(os.path.join(self.directory, name + ".collapsed"), "w") as f:
+            for stack, samples in stacks.items():
+                f.write(f"{stack} {samples}\n")
+        entry = {
+            'name': name,
+            'callback': callback,
+            'seconds': seconds,
+            'at': datetime.now(),
+            'hottest': _hottest_functions(profile),
+        }
+        self._retain(entry)
+
+    def _retain(self, entry):
+        """Add entry to the report, deleting the files of entries it pushes out."""
+        dropped = []
+        with self._lock:
+            heapq.heappush(self._slowest, (entry['seconds'], next(self._sequence), entry))
+            if len(self._slowest) > self.top_n:
+                dropped.append(heapq.heappop(self._slowest)[2])
+            self._recent.append(entry)
+            if len(self._recent) > self.top_n:
+                dropped.append(self._recent.popleft())
+            kept = {e['name'] for _, _, e in self._slowest} | {e['name'] for e in self._recent}
+        for old in dropped:
+            if old['name'] not in kept:
+                for suffix in (".prof", ".collapsed"):
+                    try:
+                        os.remove(os.path.join(self.directory, old['name'] + suffix))
+                    except FileNotFoundError:
+                        pass
+
+    def report(self):
+        """Return (slowest first, most recent first) profile entries."""
+        with self._lock:
+            slowest = [entry for _, _, entry in sorted(self._slowest, key=lambda item: item[:2], reverse=True)]
+            recent = list(reversed(self._recent))
+        return slowest, recent
+
+profiler = CallbackProfiler(config.PROFILE_DIR, config.PROFILE_TOP_N, config.PROFILE_SAMPLE_INTERVAL)
+
+def _reload_settings():
+    """Apply reloaded sampling settings to the next profiles taken."""
+    profiler.top_n = config.PROFILE_TOP_N
+    profiler.sample_interval = config.PROFILE_SAMPLE_INTERVAL
+
+config_reload.on_change(["PROFILE_TOP_N", "PROFILE_SAMPLE_INTERVAL"], _reload_settings)
+
+def _callback_name(app, body):
+    """Name of the callback function a dispatch request runs, else its outputs."""
+    output = body.get("output", "unknown")
+    function = app.callback_map.get(output, {}).get("callback")
+    return getattr(function, "__name__", None) or output.strip(".")
+
+LOCAL_ADDRESSES = {"127.0.0.1", "::1"}
+
+def _is_admin(request):
+    """Whether request comes from this machine or carries config.ADMIN_TOKEN."""
+    if request.remote_addr in LOCAL_ADDRESSES:
+        return True
+    token = request.headers.get("X-Admin-Token") or request.args.get("token")
+    return bool(config.ADMIN_TOKEN and token) and hmac.compare_digest(token, config.ADMIN_TOKEN)
+
+def _wants_profile(request):
+    if config.PROFILE_CALLBACKS:
+        return True
+    return (bool(config.PROFILE_HEADER) and request.headers.get(config.PROFILE_HEADER, "") not in ("", "0")
+            and _is_admin(request))
+
+def _report_table(title, entries, query=""):
+    rows = "".join(
+        f"<tr><td>{e['at']:%H:%M:%S}</td><td>{html.escape(e['callback'])}</td>"
+        f"<td>{e['seconds'] * 1000:.0f} ms</td>"
+        f"<td><pre>{html.escape(chr(10).join(e['hottest']))}</pre></td>"
+        f"<td><a href=\"profiles/{e['name']}.prof{query}\">pstats</a> "
+        f"<a href=\"profiles/{e['name']}.collapsed{query}\">collapsed</a></td></tr>"
+        for e in entries)
+    return (f"<h2>{title}</h2><table border=1 cellpadding=4><tr><th>Time</th><th>Callback</th>"
+            f"<th>Duration</th><th>Hottest functions (own time)</th><th>Files</th></tr>{rows}</table>")
+
+def register(app):
+    """Wrap the Dash callback route in the profiler and add the /admin/profiles report."""
+    from flask import abort, request, send_from_directory
+
+    server = app.server
+    endpoint = app.config.routes_pathname_prefix + "_dash-update-component"
+    dispatch = server.view_functions[endpoint]
+
+    def profiled_dispatch(*args, **kwargs):
+        if not _wants_profile(request):
+            return dispatch(*args, **kwargs)
+        callback = _callback_name(app, request.get_json(silent=True) or {})
+        return profiler.profile(callback, lambda: dispatch(*args, **kwargs))
+
+    server.view_functions[endpoint] = profiled_dispatch
+
+    @server.before_request
+    def require_admin():
+        if request.path.startswith("/admin/") and not _is_admin(request):
+            abort(403)
+
+    @server.route("/admin/profiles")
+    def profile_report():
+        slowest, recent = profiler.report()
+        # Keep a token given in the URL on the file links
+        query = html.escape(f"?token={request.args['token']}") if "token" in request.args else ""
+        if config.PROFILE_CALLBACKS:
+            mode = "every callback"
+        elif config.PROFILE_HEADER:
+            mode = f"callback requests with the {config.PROFILE_HEADER} header"
+        else:
+            mode = "nothing (disabled)"
+        return (f"<html><head><title>Callback profiles</title></head><body>"
+                f"<h1>Callback profiles</h1><p>Profiling {html.escape(mode)}.</p>"
+                f"{_report_table(f'Slowest {profiler.top_n}', slowest, query)}"
+                f"{_report_table('Most recent', recent, query)}</body></html>")
+
+    @server.route("/admin/profiles/<path:filename>")
+    def profile_file(filename):
+        return send_from_directory(os.path.abspath(profiler.directory), filename, as_attachment=True)
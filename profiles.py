@@ -0,0 +1,163 @@
+"""RSU profiles: the per-person part of the configuration.
+
+A profile holds one person's RSU parameters (grant value, vesting schedule,
+selling timeline and strategy settings). Market data is shared by every
+profile; only vesting and selling plan computations are per profile.
+
+The default profile is built from config.py. Additional profiles are JSON
+files in config.RSU_PROFILES_DIR, named <profile>.json, using the same keys
+as config.py; keys a file leaves out fall back to config.py, e.g.
+
+    {"TOTAL_RSU_VALUE_RMB": 800000,
+     "VESTING_SCHEDULE": [{"value_rmb": 800000, "start": "2024-03-01", "years": 4}],
+     "DEFAULT_STRATEGY": "reserve_strategy"}
+
+A profile is served at /<profile>; / serves the default one. Profiles are
+loaded again when their files or config.py change (see config_reload).
+"""
+import json
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+import config
+
+DEFAULT = "default"
+
+# Profile field -> config.py setting it comes from
+CONFIG_KEYS = {
+    'total_rsu_value_rmb': "TOTAL_RSU_VALUE_RMB",
+    'currency_exchange_rate': "CURRENCY_EXCHANGE_RATE",
+    'vesting_schedule': "VESTING_SCHEDULE",
+    'start_date': "START_DATE",
+    'end_date': "END_DATE",
+    'default_strategy': "DEFAULT_STRATEGY",
+    'reserve_percentage': "RESERVE_PERCENTAGE",
+}
+
+# Profile fields each kind of derived result reads. Caches key results by
+# these instead of the whole profile, so changing one setting only misses
+# the results that depend on it (e.g. RESERVE_PERCENTAGE only reserve plans).
+VESTING_FIELDS = ('total_rsu_value_rmb', 'currency_exchange_rate', 'vesting_schedule')
+PLAN_FIELDS = ('start_date', 'end_date')
+STRATEGY_FIELDS = {'reserve_strategy': ('reserve_percentage',)}
+
+NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+# First path segments the server routes itself; a profile there could never be
+# served. Names starting with "_" are left to Dash (/_dash-layout, ...).
+RESERVED_NAMES = {"metrics", "stream", "admin", "assets"}
+
+@dataclass(frozen=True)
+class Profile:
+    """One person's RSU parameters. Profiles are never modified after loading."""
+    name: str
+    total_rsu_value_rmb: float
+    currency_exchange_rate: float
+    vesting_schedule: tuple
+    start_date: str
+    end_date: str
+    default_strategy: str
+    reserve_percentage: float
+
+    @property
+    def total_rsu_value_usd(self):
+        return self.total_rsu_value_rmb / self.currency_exchange_rate
+
+    def _values(self, fields):
+        return repr(tuple(getattr(self, name) for name in fields))
+
+    @property
+    def vesting_key(self):
+        """Identity of the values the priced vesting schedule depends on."""
+        return self._values(VESTING_FIELDS)
+
+    def plan_key(self, strategy=None):
+        """Identity of the values one strategy's plan (None: every plan) depends on.
+
+        Plans also depend on the vesting shares, which callers key separately.
+        """
+        if strategy is None:
+            extra = tuple(name for fields in STRATEGY_FIELDS.values() for name in fields)
+        else:
+            extra = STRATEGY_FIELDS.get(strategy, ())
+        return self._values(PLAN_FIELDS + extra)
+
+def _vesting_entry(entry):
+    # JSON has no tuples: (percentage, date) pairs arrive as lists
+    return tuple(entry) if isinstance(entry, list) else entry
+
+def from_config(name=DEFAULT, overrides=None):
+    """Build a profile from config.py, with overrides keyed by config.py names."""
+    overrides = overrides or {}
+    unknown = set(overrides) - set(CONFIG_KEYS.values())
+    if unknown:
+        raise ValueError(f"Unknown profile settings: {', '.join(sorted(unknown))}")
+    values = {attribute: overrides.get(key, getattr(config, key)) for attribute, key in CONFIG_KEYS.items()}
+    values['vesting_schedule'] = tuple(_vesting_entry(e) for e in values['vesting_schedule'])
+    if values['default_strategy'] not in config.SELLING_STRATEGIES:
+        raise ValueError(f"Unknown selling strategy: {values['default_strategy']!r}")
+    return Profile(name=name, **values)
+
+def load_profile_file(path):
+    """Load one <profile>.json file."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    if not NAME_PATTERN.match(name) or name == DEFAULT:
+        raise ValueError(f"Invalid profile name: {name!r}")
+    if name in RESERVED_NAMES or name.startswith("_"):
+        raise ValueError(f"Profile name {name!r} is a reserved route (/{name} is not the dashboard)")
+    with open(path) as f:
+        return from_config(name, json.load(f))
+
+def load_profiles(directory):
+    """Load every profile file in directory; files that fail are logged and skipped."""
+    loaded = {}
+    if not os.path.isdir(directory):
+        return loaded
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            profile = load_profile_file(os.path.join(directory, filename))
+        except (OSError, ValueError, TypeError) as e:
+            logging.error(f"Skipping profile {filename}: {e}")
+            continue
+        loaded[profile.name] = profile
+    return loaded
+
+_profiles = None
+_lock = threading.Lock()
+
+def get_profiles():
+    """Return all named profiles, loading them on first use."""
+    global _profiles
+    if _profiles is None:
+        with _lock:
+            if _profiles is None:
+                _profiles = load_profiles(config.RSU_PROFILES_DIR)
+                if _profiles:
+                    logging.info(f"Loaded {len(_profiles)} profiles: {', '.join(_profiles)}")
+    return _profiles
+
+def reload_profiles():
+    """Load the profile files again, e.g. after they or config.py changed."""
+    global _profiles
+    loaded = load_profiles(config.RSU_PROFILES_DIR)
+    with _lock:
+        _profiles = loaded
+    logging.info(f"Reloaded profiles: {', '.join(loaded) or 'none'}")
+
+def get_profile(name=None):
+    """Return the profile called name; the default profile for None, "" or "default".
+
+    Unknown names return None.
+    """
+    if not name or name == DEFAULT:
+        return from_config()
+    return get_profiles().get(name)
+
+def profile_from_path(pathname):
+    """Return (profile name, profile) for a dashboard URL path like /alice."""
+    name = (pathname or "/").strip("/").split("/")[0]
+    return name or DEFAULT, get_profile(name)
@@ -0,0 +1,174 @@
+"""Market data providers.
+
+Everything stock_data needs from the market goes through a MarketDataProvider.
+YFinanceProvider talks to Yahoo Finance; ReplayProvider serves recorded
+fixtures with optional latency and error injection, so the app can be
+benchmarked and load-tested without network access. config.DATA_PROVIDER
+selects which one is used.
+
+Record fixtures for the replay provider with:
+
+    python providers.py record AMZN
+"""
+import json
+import os
+import random
+import sys
+import time
+import pandas as pd
+import config
+from price_store import slice_period
+
+# Recorded timestamps are replayed in exchange time, like Yahoo returns them
+MARKET_TIMEZONE = "America/New_York"
+
+class MarketDataProvider:
+    """Interface implemented by every market data source.
+
+    history and intraday return DataFrames with Open/High/Low/Close/Volume
+    columns indexed by timestamp, or raise on failure.
+    """
+
+    def current_price(self, symbol):
+        """Return the latest traded price."""
+        return self.history(symbol, period="1d")['Close'].iloc[-1]
+
+    def history(self, symbol, period=None, start=None):
+        """Return daily bars for a Yahoo period string or from a start date."""
+        raise NotImplementedError
+
+    def intraday(self, symbol, interval="5m", start=None):
+        """Return intraday bars for the current session, or from start."""
+        raise NotImplementedError
+
+    def info(self, symbol):
+        """Return the ticker info dict (market cap, P/E, 52-week range, ...)."""
+        raise NotImplementedError
+
+class YFinanceProvider(MarketDataProvider):
+    """Live data from Yahoo Finance."""
+
+    @property
+    def _yf(self):
+        import yfinance  # Only needed when talking to Yahoo, so loaded on the first fetch
+        return yfinance
+
+    def history(self, symbol, period=None, start=None):
+        if start is not None:
+            return self._yf.Ticker(symbol).history(start=start)
+        return self._yf.Ticker(symbol).history(period=period)
+
+    def intraday(self, symbol, interval="5m", start=None):
+        if start is not None:
+            return self._yf.Ticker(symbol).history(start=start, interval=interval)
+        return self._yf.Ticker(symbol).history(period="1d", interval=interval)
+
+    def info(self, symbol):
+        return self._yf.Ticker(symbol).info
+
+class ReplayProvider(MarketDataProvider):
+    """Serves recorded fixtures from a directory instead of the network.
+
+    For each symbol the directory holds <SYMBOL>.csv (or .parquet) with daily
+    bars, and optionally <SYMBOL>_intraday.csv/.parquet and <SYMBOL>_info.json.
+    Every call sleeps for `latency` seconds and fails with ConnectionError
+    with probability `error_rate`; `seed` makes the injected errors repeatable.
+    """
+
+    def __init__(self, data_dir, latency=0.0, error_rate=0.0, seed=None):
+        self.data_dir = data_dir
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._frames = {}
+
+    def _simulate_network(self):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise ConnectionError("Injected replay provider error")
+
+    def _load(self, name):
+        if name not in self._frames:
+            base = os.path.join(self.data_dir, name)
+            if os.path.exists(base + ".parquet"):
+                df = pd.read_parquet(base + ".parquet")
+            elif os.path.exists(base + ".csv"):
+                df = pd.read_csv(base + ".csv", index_col=0)
+            else:
+                df = pd.DataFrame()
+            try:
+                index = pd.DatetimeIndex(pd.to_datetime(df.index))
+            except ValueError:
+                # CSV offsets differ across DST changes
+                index = pd.DatetimeIndex(pd.to_datetime(df.index, utc=True))
+            # Naive timestamps are market time already; reading them as UTC
+            # would move daily bars to the evening before
+            if index.tz is None:
+                index = index.tz_localize(MARKET_TIMEZONE)
+            df.index = pd.DatetimeIndex(index.tz_convert(MARKET_TIMEZONE), name='Date')
+            self._frames[name] = df.sort_index()
+        return self._frames[name]
+
+    @staticmethod
+    def _since(bars, start):
+        start = pd.Timestamp(start)
+        if start.tz is None:
+            start = start.tz_localize(MARKET_TIMEZONE)
+        return bars[bars.index >= start]
+
+    def history(self, symbol, period=None, start=None):
+        self._simulate_network()
+        bars = self._load(symbol.upper())
+        if start is not None:
+            return self._since(bars, start)
+        return slice_period(bars, period or "max")
+
+    def intraday(self, symbol, interval="5m", start=None):
+        self._simulate_network()
+        bars = self._load(f"{symbol.upper()}_intraday")
+        if bars.empty:
+            return bars
+        if start is not None:
+            return self._since(bars, start)
+        return bars[bars.index.normalize() == bars.index[-1].normalize()]
+
+    def info(self, symbol):
+        self._simulate_network()
+        path = os.path.join(self.data_dir, f"{symbol.upper()}_info.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+def get_provider():
+    """Create the provider selected by config.DATA_PROVIDER."""
+    if config.DATA_PROVIDER == "replay":
+        return ReplayProvider(
+            config.REPLAY_DATA_DIR,
+            latency=config.REPLAY_LATENCY,
+            error_rate=config.REPLAY_ERROR_RATE,
+            seed=config.REPLAY_SEED,
+        )
+    if config.DATA_PROVIDER == "yfinance":
+        return YFinanceProvider()
+    raise ValueError(f"Unknown DATA_PROVIDER: {config.DATA_PROVIDER!r}")
+
+def record_fixtures(symbol, data_dir, provider=None):
+    """Save daily bars, intraday bars and info for symbol as replay fixtures."""
+    provider = provider or YFinanceProvider()
+    os.makedirs(data_dir, exist_ok=True)
+    symbol = symbol.upper()
+    provider.history(symbol, period="max").to_csv(os.path.join(data_dir, f"{symbol}.csv"))
+    provider.intraday(symbol).to_csv(os.path.join(data_dir, f"{symbol}_intraday.csv"))
+    with open(os.path.join(data_dir, f"{symbol}_info.json"), "w") as f:
+        json.dump(provider.info(symbol), f, default=str)
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == "record":
+        for symbol in sys.argv[2:]:
+            record_fixtures(symbol, config.REPLAY_DATA_DIR)
+            print(f"✅ Recorded {symbol} fixtures in {config.REPLAY_DATA_DIR}")
+    else:
+        print("Usage: python providers.py record SYMBOL [SYMBOL ...]")
+        sys.exit(1)
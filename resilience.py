@@ -0,0 +1,111 @@
+import random
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+class UpstreamUnavailable(Exception):
+    """Raised when an upstream call failed or was skipped by its circuit breaker."""
+
+class RetryPolicy:
+    """Exponential backoff with jitter between attempts on a failing upstream.
+
+    The delay after the n-th consecutive failure is drawn from
+    [d/2, d] where d = min(max_delay, base_delay * 2**(n-1)), so clients that
+    failed together do not all retry at the same moment.
+    """
+
+    def __init__(self, base_delay, max_delay):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, failures):
+        ceiling = min(self.max_delay, self.base_delay * 2 ** max(failures - 1, 0))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+class CircuitBreaker:
+    """Guards one upstream fetch path without ever sleeping in the caller.
+
+    A failed call does not retry in place. Instead the breaker refuses calls
+    until the backoff delay from its RetryPolicy has passed, and callers
+    fall back to the last good data in the meantime. After failure_threshold
+    consecutive failures the circuit opens and every call fails fast for
+    reset_timeout seconds; then a single probe call is let through
+    (half-open), which either closes the circuit or opens it again.
+    """
+
+    def __init__(self, name, failure_threshold, reset_timeout, retry_policy):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.retry_policy = retry_policy
+        self.state = CLOSED
+        self.failures = 0
+        self.last_error = None
+        self.last_success = None
+        self._retry_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go upstream right now."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == CLOSED:
+                return now >= self._retry_at
+            if self.state == OPEN and now >= self._retry_at:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.last_error = None
+            self.last_success = time.time()
+            self._retry_at = 0.0
+            self._probing = False
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)
+            self._probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self._retry_at = time.monotonic() + self.reset_timeout
+            else:
+                self._retry_at = time.monotonic() + self.retry_policy.delay(self.failures)
+
+    def call(self, fn):
+        """Run fn through the breaker, raising UpstreamUnavailable on failure."""
+        if not self.allow():
+            raise UpstreamUnavailable(f"{self.name}: circuit {self.state}, retry in {self.retry_in():.0f}s")
+        try:
+            result = fn()
+        except Exception as e:
+            self.record_failure(e)
+            raise UpstreamUnavailable(f"{self.name}: {e}") from e
+        self.record_success()
+        return result
+
+    def retry_in(self):
+        """Seconds until the next upstream attempt is allowed."""
+        return max(0.0, self._retry_at - time.monotonic())
+
+    def status(self):
+        """Summary of the breaker for display; stale means the last call failed."""
+        return {
+            'name': self.name,
+            'state': self.state,
+            'failures': self.failures,
+            'stale': self.failures > 0,
+            'retry_in': self.retry_in(),
+            'last_error': self.last_error,
+            'last_success': self.last_success,
+        }
@@ -2,30 +2,47 @@
 """
 Amazon Stock Tracker - Run Script
 This script launches the Amazon Stock Tracker application with proper error handling.
+
+    python run.py                  # Development server
+    python run.py --production     # Multi-worker gunicorn server (pip install gunicorn)
 """
 
+import time
+
+LAUNCHED_AT = time.perf_counter()
+
+import argparse
+import importlib.util
+import json
 import sys
 import os
 import socket
+import threading
+import urllib.request
 import webbrowser
 from time import sleep
 
+# Module name -> pip package name
+REQUIRED_MODULES = {
+    "dash": "dash",
+    "dash_bootstrap_components": "dash-bootstrap-components",
+    "yfinance": "yfinance",
+    "pandas": "pandas",
+    "plotly": "plotly",
+    "numpy": "numpy",
+}
+
 def check_dependencies():
-    """Verify all required dependencies are installed."""
-    try:
-        import dash
-        import dash_bootstrap_components as dbc
-        import yfinance
-        import pandas
-        import plotly
-        import numpy
-        print("✅ All dependencies installed.")
-        return True
-    except ImportError as e:
-        print(f"❌ Missing dependency: {e}")
+    """Verify all required dependencies are installed (without importing them)."""
+    missing = [package for module, package in REQUIRED_MODULES.items()
+               if importlib.util.find_spec(module) is None]
+    if missing:
+        print(f"❌ Missing dependencies: {', '.join(missing)}")
         print("\nPlease install all dependencies with:")
         print("pip install -r requirements.txt\n")
         return False
+    print("✅ All dependencies installed.")
+    return True
 
 def get_ip_address():
     """Get the local IP address for network access."""
@@ -38,8 +55,158 @@ def get_ip_address():
     except:
         return "Could not determine IP"
 
-def main():
+def since_launch():
+    return time.perf_counter() - LAUNCHED_AT
+
+def warm_up():
+    """Build the first market snapshot and selling plans from the price store.
+
+    Returns the seconds it took, or None if the store has no data yet (the
+    first page load then fetches from upstream).
+    """
+    import market_snapshot
+    started = time.perf_counter()
+    if market_snapshot.refresher.warm_up() is None:
+        return None
+    return time.perf_counter() - started
+
+def report_first_paint(port, timings):
+    """Once the server is up, load the page and price chart like a browser and print startup timings.
+
+    Time to first meaningful paint runs from launch until the price chart
+    figure is served: page, layout, the stock data store, then the chart.
+    """
+    base = f"http://127.0.0.1:{port}"
+    
+    def get_json(path):
+        with urllib.request.urlopen(f"{base}{path}", timeout=30) as response:
+            return json.loads(response.read())
+    
+    def layout_props(node, props):
+        """Collect the initial props of every component with an id, as the browser renders them."""
+        if isinstance(node, list):
+            for child in node:
+                layout_props(child, props)
+        elif isinstance(node, dict):
+            node_props = node.get("props", {})
+            if "id" in node_props:
+                props[str(node_props["id"])] = node_props
+            for value in node_props.values():
+                layout_props(value, props)
+        return props
+    
+    def post_callback(callbacks, props, output, values):
+        """Call the callback registered for output with the layout's initial props.
+        
+        Inputs and state come from the callback's registration, so new
+        inputs are filled in like the browser would; values overrides some.
+        """
+        callback = next(c for c in callbacks if c["output"] == output)
+        
+        def fill(dependencies):
+            return [{"id": d["id"], "property": d["property"],
+                     "value": values.get((d["id"], d["property"]), props.get(d["id"], {}).get(d["property"]))}
+                    for d in dependencies]
+        
+        outputs = [dict(zip(("id", "property"), o.rsplit(".", 1))) for o in output.strip(".").split("...")]
+        body = json.dumps({
+            "output": output,
+            "outputs": outputs if len(outputs) > 1 else outputs[0],
+            "inputs": fill(callback["inputs"]),
+            "state": fill(callback["state"]),
+            "changedPropIds": [],
+        }).encode()
+        request = urllib.request.Request(f"{base}/_dash-update-component", data=body,
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=120) as response:
+            return json.loads(response.read())["response"]
+    
+    def probe():
+        while True:
+            try:
+                urllib.request.urlopen(f"{base}/", timeout=5).read()
+                break
+            except OSError:
+                sleep(0.05)
+        timings["server ready"] = since_launch()
+        try:
+            props = layout_props(get_json("/_dash-layout"), {})
+            callbacks = get_json("/_dash-dependencies")
+            stock = post_callback(
+                callbacks, props, "..stock-data-store.data...stock-data-fingerprint.data..", {}
+            )["stock-data-store"]["data"]
+            post_callback(
+                callbacks, props, "..price-chart.figure...price-chart-state.data..",
+                {("stock-data-store", "data"): stock},
+            )
+        except Exception as e:
+            print(f"⚠️ Could not measure first paint: {e}")
+            return
+        timings["first meaningful paint"] = since_launch()
+        print("⏱️ Startup: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
+    
+    threading.Thread(target=probe, name="first-paint-probe", daemon=True).start()
+
+def use_thread_count(threads):
+    """Re-read config.py for `threads` threads per worker.
+
+    Settings derived from THREADS (STREAM_MAX_CLIENTS) then match the threads
+    gunicorn actually runs. The count goes through the environment, so the
+    workers and later config reloads see it as well.
+    """
+    import config
+    os.environ["STOCK_TRACKER_THREADS"] = str(threads)
+    importlib.reload(config)
+
+def run_production(port, workers, threads, preload, warm):
+    """Serve app.server through gunicorn with several worker processes."""
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        print("❌ Production mode needs gunicorn:")
+        print("pip install gunicorn\n")
+        return 1
+    
+    # Before the workers fork, so each of them limits its streams accordingly
+    use_thread_count(threads)
+    import config
+    import stock_data
+    import metrics
+    # Workers share fetched market data instead of each fetching it, and
+    # /metrics reports all of them whichever one serves the scrape
+    stock_data.use_shared_cache(config.SHARED_CACHE_PATH)
+    metrics.use_shared_store(config.SHARED_CACHE_PATH)
+    
+    class DashboardServer(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{config.HOST}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("threads", threads)
+            self.cfg.set("preload_app", preload)
+        
+        def load(self):
+            # Runs once in the master with preload, otherwise in every worker
+            import app
+            if warm:
+                warm_up()
+            return app.server
+    
+    DashboardServer().run()
+    return 0
+
+def main(argv=None):
     """Main entry point for the application."""
+    parser = argparse.ArgumentParser(description="Run the Amazon Stock Tracker dashboard.")
+    parser.add_argument("--production", action="store_true",
+                        help="serve with gunicorn worker processes instead of the development server")
+    parser.add_argument("--workers", type=int,
+                        help="worker processes in production mode (default config.WORKERS)")
+    parser.add_argument("--threads", type=int,
+                        help="threads per worker in production mode (default config.THREADS)")
+    parser.add_argument("--no-warm-up", action="store_true",
+                        help="skip filling the caches from the price store before serving")
+    args = parser.parse_args(argv)
+    
     # Check if dependencies are installed
     if not check_dependencies():
         return 1
@@ -50,17 +217,35 @@ def main():
         print("Please create config.py with your RSU details.")
         return 1
     
-    # Import our app module
+    # Network discovery runs while the app loads
+    network = {}
+    ip_thread = threading.Thread(target=lambda: network.update(ip=get_ip_address()), daemon=True)
+    ip_thread.start()
+    
+    # Import our app module (in production mode gunicorn loads it, see PRELOAD_APP)
+    timings = {}
     try:
-        import app
         import config
+        if not args.production:
+            import app
+            timings["imports"] = since_launch()
     except Exception as e:
         print(f"❌ Error importing application modules: {e}")
         return 1
     
+    # Fill the caches from the price store before the port opens
+    warm = config.WARM_UP_ON_START and not args.no_warm_up
+    if warm and not args.production:
+        seconds = warm_up()
+        if seconds is None:
+            print("ℹ️ Price store is empty; the first page load will fetch market data.")
+        else:
+            timings["warm-up"] = seconds
+    
     # Get network information
     hostname = socket.gethostname()
-    ip_address = get_ip_address()
+    ip_thread.join(timeout=1)
+    ip_address = network.get("ip", "Could not determine IP")
     port = config.DEFAULT_PORT
     
     # Display startup information
@@ -70,8 +255,17 @@ def main():
     print(f"📊 Local URL: http://localhost:{port}")
     print(f"🌐 Network URL: http://{ip_address}:{port}")
     print(f"💻 Hostname: {hostname}")
+    if args.production:
+        workers = args.workers or config.WORKERS
+        threads = args.threads or config.THREADS
+        print(f"🏭 Production mode: {workers} workers x {threads} threads")
     print("="*60)
     
+    report_first_paint(port, timings)
+    
+    if args.production:
+        return run_production(port, workers, threads, config.PRELOAD_APP, warm)
+    
     # Open browser automatically after delay
     def open_browser():
         sleep(2)  # Short delay to allow server to start
@@ -80,7 +274,6 @@ def main():
         webbrowser.open(local_url)
 
     # Run in a separate thread to not block the main thread
-    import threading
     browser_thread = threading.Thread(target=open_browser)
     browser_thread.daemon = True
     browser_thread.start()
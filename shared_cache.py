@@ -0,0 +1,115 @@
+"""Market data cache shared by every worker process through one SQLite file.
+
+In production mode several worker processes serve the dashboard, each with
+its own MarketDataCache. Backing them with a SharedCache means a value one
+worker fetched is reused by the others until its TTL expires. Loads are
+single-flight across processes: the first worker to miss a key takes a
+lease on it and fetches; the others wait for its result instead of fetching
+the same data again.
+"""
+import logging
+import os
+import pickle
+import sqlite3
+import time
+from contextlib import contextmanager
+
+class SharedCache:
+    """Pickled cache entries and load leases in a SQLite database."""
+
+    def __init__(self, path, lease_timeout=60, poll_interval=0.05):
+        self.path = path
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY, kind TEXT NOT NULL, expires REAL NOT NULL, value BLOB NOT NULL)""")
+            conn.execute("""CREATE TABLE IF NOT EXISTS leases (
+                key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)""")
+
+    @staticmethod
+    def _owner():
+        # Per process, since workers are forked after the cache is created
+        return str(os.getpid())
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _lookup(self, key):
+        """Return (value, seconds left) of a live entry, or None."""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, expires FROM entries WHERE key = ? AND expires > ?",
+                               (key, now)).fetchone()
+        return (pickle.loads(row[0]), row[1] - now) if row else None
+
+    def _store(self, kind, key, value, ttl):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+            conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                         (key, kind, now + ttl, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)))
+
+    def _acquire(self, key):
+        """Take the load lease on key unless another live worker holds it."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM leases WHERE key = ? AND expires <= ?", (key, now))
+            cursor = conn.execute("INSERT OR IGNORE INTO leases VALUES (?, ?, ?)",
+                                  (key, self._owner(), now + self.lease_timeout))
+            return cursor.rowcount == 1
+
+    def _release(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self._owner()))
+
+    def load(self, kind, key, loader, is_empty):
+        """Return the shared value for (kind, key), loading it in one worker only.
+
+        loader returns (value, seconds to share it for). Empty results (per
+        is_empty) and values with no time to live are returned but not
+        shared, so the next worker to ask tries again.
+
+        Returns:
+            (value, seconds until the shared entry expires)
+        """
+        cache_key = repr((kind,) + tuple(key))
+        while True:
+            hit = self._lookup(cache_key)
+            if hit is not None:
+                return hit
+            if self._acquire(cache_key):
+                break
+            time.sleep(self.poll_interval)  # Another worker is loading it
+
+        try:
+            # It may have been stored between our lookup and taking the lease
+            hit = self._lookup(cache_key)
+            if hit is not None:
+                return hit
+            value, ttl = loader()
+            if not is_empty(value) and ttl > 0:
+                try:
+                    self._store(kind, cache_key, value, ttl)
+                except (sqlite3.Error, pickle.PicklingError) as e:
+                    logging.warning(f"Could not share cached {kind}: {e}")
+            return value, ttl
+        finally:
+            self._release(cache_key)
+
+    def clear(self, kind=None):
+        """Drop shared entries, either all of them or only those of one kind."""
+        with self._connect() as conn:
+            if kind is None:
+                conn.execute("DELETE FROM entries")
+            else:
+                conn.execute("DELETE FROM entries WHERE kind = ?", (kind,))
@@ -0,0 +1,164 @@
+"""Monte Carlo simulation of selling-plan outcomes.
+
+Future monthly prices are simulated for many paths at once as a
+(paths x months) NumPy array, either with geometric Brownian motion fitted
+to daily history or by bootstrapping historical one-month returns. Every
+strategy's share plan is then evaluated against all paths with a single
+matrix product. Large path counts are split into chunks that run on a
+process pool.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import config
+
+TRADING_DAYS_PER_MONTH = 21
+PERCENTILES = [5, 25, 50, 75, 95]
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_process_pool():
+    """Return the worker pool shared by the simulation and backtests, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn avoids forking a process that is running server threads
+            _pool = ProcessPoolExecutor(
+                max_workers=config.SIMULATION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+def monthly_log_returns(closes):
+    """Overlapping one-month (21 trading day) log returns of a close series."""
+    log_closes = np.log(np.asarray(closes, dtype=float))
+    return log_closes[TRADING_DAYS_PER_MONTH:] - log_closes[:-TRADING_DAYS_PER_MONTH]
+
+def simulate_price_paths(start_price, n_months, n_paths, closes, method="gbm", seed=None):
+    """Simulate month-end prices for n_paths paths.
+
+    Args:
+        start_price: Price the paths start from
+        n_months: Number of monthly steps
+        n_paths: Number of paths
+        closes: Historical daily closes used to fit the model
+        method: "gbm" for geometric Brownian motion with drift and volatility
+            estimated from the daily closes, or "bootstrap" to resample
+            historical one-month returns
+        seed: Seed or numpy SeedSequence for reproducible paths
+
+    Returns:
+        Array of shape (n_paths, n_months) with the price at each month
+    """
+    rng = np.random.default_rng(seed)
+    if method == "bootstrap":
+        samples = monthly_log_returns(closes)
+        steps = samples[rng.integers(0, len(samples), size=(n_paths, n_months))]
+    elif method == "gbm":
+        daily = np.diff(np.log(np.asarray(closes, dtype=float)))
+        mu = daily.mean() * TRADING_DAYS_PER_MONTH
+        sigma = daily.std() * np.sqrt(TRADING_DAYS_PER_MONTH)
+        steps = rng.standard_normal((n_paths, n_months)) * sigma + (mu - sigma ** 2 / 2)
+    else:
+        raise ValueError(f"Unknown simulation method: {method!r}")
+    return start_price * np.exp(np.cumsum(steps, axis=1))
+
+def _simulate_chunk(start_price, plans, n_paths, closes, method, seed, n_fan_paths):
+    """Simulate one chunk of paths and evaluate every plan against it.
+
+    Runs in a worker process for large simulations, so it only returns the
+    per-path proceeds and a small sample of paths for the fan chart.
+    """
+    paths = simulate_price_paths(start_price, plans.shape[1], n_paths, closes, method, seed)
+    return paths @ plans.T, paths[:n_fan_paths].astype(np.float32)
+
+def summarize_proceeds(proceeds, strategies):
+    """Distribution statistics of a (outcomes x strategies) proceeds array."""
+    return pd.DataFrame({
+        'mean': proceeds.mean(axis=0),
+        **{f'p{p}': q for p, q in zip(PERCENTILES, np.percentile(proceeds, PERCENTILES, axis=0))},
+        'worst': proceeds.min(axis=0),
+        'best': proceeds.max(axis=0),
+    }, index=pd.Index(strategies, name='strategy'))
+
+def simulate_selling_outcomes(plans, start_price, closes, n_paths=None, method=None, seed=None):
+    """Evaluate every strategy's proceeds distribution across simulated paths.
+
+    Args:
+        plans: Dict of strategy -> shares to sell each month (equal lengths)
+        start_price: Current price the simulated paths start from
+        closes: Historical daily closes used to fit the price model
+        n_paths: Number of paths (default config.SIMULATION_PATHS)
+        method: "gbm" or "bootstrap" (default config.SIMULATION_METHOD)
+        seed: Seed for reproducible results (default config.SIMULATION_SEED)
+
+    Returns:
+        Dict with 'proceeds': DataFrame of proceeds statistics (USD) per
+        strategy, and 'price_fan': DataFrame of simulated price percentiles
+        per month
+    """
+    n_paths = n_paths or config.SIMULATION_PATHS
+    method = method or config.SIMULATION_METHOD
+    seed = config.SIMULATION_SEED if seed is None else seed
+    strategies = list(plans)
+    plan_matrix = np.vstack([np.asarray(plans[s], dtype=float) for s in strategies])
+    closes = np.asarray(closes, dtype=float)
+
+    chunk_size = config.SIMULATION_CHUNK_PATHS
+    n_chunks = max(1, -(-n_paths // chunk_size))
+    chunk_sizes = [n_paths // n_chunks + (i < n_paths % n_chunks) for i in range(n_chunks)]
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    n_fan_paths = -(-config.SIMULATION_FAN_PATHS // n_chunks)
+    chunk_args = [
+        (start_price, plan_matrix, size, closes, method, chunk_seed, n_fan_paths)
+        for size, chunk_seed in zip(chunk_sizes, seeds)
+    ]
+
+    if n_chunks == 1:
+        results = [_simulate_chunk(*chunk_args[0])]
+    else:
+        pool = get_process_pool()
+        futures = [pool.submit(_simulate_chunk, *args) for args in chunk_args]
+        results = [future.result() for future in futures]
+        logging.info(f"Simulated {n_paths} paths in {n_chunks} chunks on the process pool")
+
+    proceeds = np.concatenate([chunk_proceeds for chunk_proceeds, _ in results])
+    fan_paths = np.concatenate([chunk_paths for _, chunk_paths in results])
+
+    proceeds_stats = summarize_proceeds(proceeds, strategies)
+
+    price_fan = pd.DataFrame(
+        np.percentile(fan_paths, PERCENTILES, axis=0).T,
+        columns=[f'p{p}' for p in PERCENTILES],
+    )
+    price_fan.index.name = 'month'
+
+    return {'proceeds': proceeds_stats, 'price_fan': price_fan}
+
+def get_selling_outcomes(snapshot, profile=None, vesting=None):
+    """Simulated outcomes of every selling strategy for a market snapshot.
+
+    Results are cached per (current price, history content, simulation
+    settings, profile vesting and plan settings), so all clients of a
+    profile share one simulation per price update. vesting is the profile's
+    priced vesting schedule (the snapshot's by default).
+    """
+    import stock_data  # Not needed by the worker processes
+    import profiles
+    profile = profile or profiles.from_config()
+    vesting = snapshot.vesting if vesting is None else vesting
+    history = snapshot.history
+    key = (float(snapshot.current_price), snapshot.history_key, config.SIMULATION_PATHS, config.SIMULATION_METHOD,
+           config.SIMULATION_LOOKBACK, config.SIMULATION_SEED, config.SIMULATION_CHUNK_PATHS,
+           config.SIMULATION_FAN_PATHS, profile.vesting_key, profile.plan_key())
+
+    def simulate():
+        plans = stock_data.get_strategy_plans(vesting, snapshot.current_price, history, profile)
+        closes = stock_data.slice_period(history, config.SIMULATION_LOOKBACK)['Close']
+        return simulate_selling_outcomes(plans, snapshot.current_price, closes)
+
+    return stock_data.market_cache.get("simulation", key, simulate)
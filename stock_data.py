@@ -1,175 +1,712 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import config
+from price_store import PriceStore, normalize_bars, slice_period
+from indicators import IndicatorSet
+from intraday import IntradayRing, ring_capacity, INTERVAL_MAX_DAYS
+import profiles
+import config_reload
+from resilience import CircuitBreaker, RetryPolicy, UpstreamUnavailable
+from providers import get_provider
 import time
 import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+import metrics
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def get_current_price(symbol=config.STOCK_SYMBOL, max_retries=3, retry_delay=5):
-    """Get the current stock price for the given symbol with retry logic."""
-    for attempt in range(max_retries):
+class _Flight:
+    """An upstream load in progress that other callers can wait on."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+class Stale:
+    """A fallback value a loader serves while its upstream path is failing.
+
+    The cache keeps it only until the path's circuit breaker allows the next
+    attempt, so the fetch is retried then instead of after the full TTL.
+    """
+
+    def __init__(self, value, breaker_name):
+        self.value = value
+        self.ttl = breakers[breaker_name].retry_in()
+
+class MarketDataCache:
+    """Process-wide TTL cache for market data with single-flight loading.
+
+    Entries are keyed by (kind, *key) and expire after the TTL configured for
+    their kind. When several threads ask for the same missing key at once, only
+    the first one calls the loader; the others block until it finishes and
+    share its result. Empty results (None, an empty DataFrame or dict) are
+    returned but never stored, so a failed fetch is retried on the next call;
+    fallbacks a loader wraps in Stale are stored until the next retry only.
+
+    Cached DataFrames are shared between callers and must be treated as
+    read-only.
+
+    With a SharedCache attached (see use_shared_cache), misses are loaded
+    through it, so worker processes share fetched values as well.
+    """
+
+    def __init__(self, ttls):
+        self.ttls = dict(ttls)
+        self.shared = None
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind, key, loader):
+        """Return the cached value for (kind, *key), loading it if needed."""
+        cache_key = (kind,) + tuple(key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] > time.monotonic():
+                metrics.MARKET_CACHE_REQUESTS.inc(kind=kind, result="hit")
+                return entry[1]
+            flight = self._inflight.get(cache_key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _Flight()
+                self._inflight[cache_key] = flight
+        metrics.MARKET_CACHE_REQUESTS.inc(kind=kind, result="miss" if is_leader else "wait")
+
+        if not is_leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        ttl = self.ttls.get(kind, 0)
+
+        def load():
+            value = loader()
+            if isinstance(value, Stale):
+                return value.value, min(ttl, value.ttl)
+            return value, ttl
+
         try:
-            ticker = yf.Ticker(symbol)
-            todays_data = ticker.history(period='1d')
-            if not todays_data.empty:
-                return todays_data['Close'].iloc[-1]
-            raise ValueError("Empty data returned from Yahoo Finance")
+            if self.shared is not None:
+                flight.value, ttl = self.shared.load(kind, key, load, is_empty)
+            else:
+                flight.value, ttl = load()
         except Exception as e:
-            logging.warning(f"Attempt {attempt+1}/{max_retries} failed: {str(e)}")
-            if attempt < max_retries - 1:
-                logging.info(f"Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if flight.error is None and not is_empty(flight.value) and ttl > 0:
+                    now = time.monotonic()
+                    # Drop expired entries so keys that are never asked for again don't pile up
+                    for expired in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+                        del self._entries[expired]
+                    self._entries[cache_key] = (now + ttl, flight.value)
+                del self._inflight[cache_key]
+            flight.event.set()
+        return flight.value
+
+    def invalidate(self, kind=None):
+        """Drop cached entries, either all of them or only those of one kind."""
+        if self.shared is not None:
+            self.shared.clear(kind)
+        with self._lock:
+            if kind is None:
+                self._entries.clear()
             else:
-                logging.error(f"Failed to retrieve current price after {max_retries} attempts")
-                return None
+                for cache_key in [k for k in self._entries if k[0] == kind]:
+                    del self._entries[cache_key]
+
+def is_empty(value):
+    """Whether a fetch result carries no data (None, empty DataFrame or dict)."""
+    if isinstance(value, pd.DataFrame):
+        return value.empty
+    return value is None or value == {}
+
+# Shared by every callback and every client of this process
+market_cache = MarketDataCache(config.CACHE_TTL)
+
+def _reload_cache_ttls():
+    # Entries already cached keep the expiry they were stored with
+    market_cache.ttls = dict(config.CACHE_TTL)
+
+config_reload.on_change(["CACHE_TTL"], _reload_cache_ttls)
+
+def use_shared_cache(path=config.SHARED_CACHE_PATH):
+    """Share market data with other worker processes through a SQLite file."""
+    from shared_cache import SharedCache
+    market_cache.shared = SharedCache(path)
+
+# Source of all market data (Yahoo Finance or recorded fixtures, see config.DATA_PROVIDER)
+provider = get_provider()
+
+# Daily bars persisted across restarts; only bars after the last stored one are downloaded
+price_store = PriceStore(config.PRICE_STORE_PATH)
+
+# One breaker per upstream fetch path, all sharing the same backoff policy
+retry_policy = RetryPolicy(config.RETRY_DELAY, config.RETRY_MAX_DELAY)
+breakers = {
+    name: CircuitBreaker(name, config.MAX_RETRIES, config.BREAKER_RESET_TIMEOUT, retry_policy)
+    for name in ("price", "history", "intraday", "stats")
+}
+
+# Public function each breaker's fetches serve, used to label upstream metrics
+UPSTREAM_FUNCTIONS = {
+    "price": "get_current_price",
+    "history": "get_historical_data",
+    "intraday": "get_intraday_data",
+    "stats": "get_stock_stats",
+}
+
+def upstream_status():
+    """Return the circuit breaker status of every upstream fetch path."""
+    return [breaker.status() for breaker in breakers.values()]
+
+def _call_upstream(breaker_name, fetch):
+    """Call fetch through the named circuit breaker, recording upstream metrics."""
+    breaker = breakers[breaker_name]
+    function = UPSTREAM_FUNCTIONS[breaker_name]
+    attempted = []
+
+    def timed():
+        attempted.append(True)
+        if breaker.failures:
+            metrics.UPSTREAM_RETRIES.inc(function=function)
+        with metrics.UPSTREAM_SECONDS.time(function=function):
+            return fetch()
+
+    try:
+        result = breaker.call(timed)
+    except UpstreamUnavailable:
+        metrics.UPSTREAM_REQUESTS.inc(function=function, outcome="failure" if attempted else "skipped")
+        raise
+    metrics.UPSTREAM_REQUESTS.inc(function=function, outcome="success")
+    return result
+
+def _fetch_history(breaker_name, symbol, **history_args):
+    """Download price history from the data provider through a circuit breaker.
+
+    history_args are passed through to provider.history (period or start).
+    Returns an empty DataFrame when the call fails or the breaker skips it;
+    the breaker decides when the next attempt is allowed, so this never sleeps.
+    """
+    def fetch():
+        hist_data = provider.history(symbol, **history_args)
+        if hist_data.empty:
+            raise ValueError("Empty data returned from the data provider")
+        return hist_data
+
+    try:
+        return _call_upstream(breaker_name, fetch)
+    except UpstreamUnavailable as e:
+        request = ", ".join(f"{k}={v}" for k, v in history_args.items())
+        logging.warning(f"Failed to retrieve {symbol} data ({request}): {e}")
+        return pd.DataFrame()  # Return empty DataFrame on failure
 
-def get_historical_data(symbol=config.STOCK_SYMBOL, period="2y", max_retries=3, retry_delay=5):
-    """Get historical stock data with retry logic.
+def _sync_history(symbol):
+    """Bring the stored daily bars for symbol up to date and return all of them.
+
+    The first call downloads the full history. Later calls only download the
+    bars from the second-to-last stored date onwards: the last bar may still
+    have been forming when it was stored, and the one before it is final, so
+    a mismatch there means Yahoo re-adjusted the series (split or dividend)
+    and the whole history is downloaded again. When Yahoo is unreachable the
+    stored bars are served as they are, until the next retry.
+    """
+    stored = price_store.load(symbol)
+    if stored.empty:
+        full = _fetch_history("history", symbol, period="max")
+        if full.empty:
+            return Stale(stored, "history")
+        price_store.replace(symbol, full)
+        return price_store.load(symbol)
+
+    anchor = stored.index[-2] if len(stored) > 1 else stored.index[-1]
+    delta = _fetch_history("history", symbol, start=anchor.strftime('%Y-%m-%d'))
+    if delta.empty:
+        logging.info(f"Serving {len(stored)} stored bars for {symbol}")
+        return Stale(stored, "history")
+
+    delta = normalize_bars(delta)
+    if anchor in delta.index and not np.isclose(
+        delta.at[anchor, 'Close'], stored.at[anchor, 'Close'], rtol=1e-4
+    ):
+        logging.info(f"{symbol} history was re-adjusted upstream, reloading it")
+        full = _fetch_history("history", symbol, period="max")
+        if full.empty:
+            return Stale(stored, "history")
+        price_store.replace(symbol, full)
+        invalidate_plans()
+    else:
+        price_store.upsert(symbol, delta)
+    return price_store.load(symbol)
+
+def _load_today(symbol):
+    todays_data = _fetch_history("price", symbol, period='1d')
+    if todays_data.empty:
+        return Stale(get_historical_data(symbol, period="1d"), "price")
+    return todays_data
+
+def get_today_data(symbol=config.STOCK_SYMBOL):
+    """Get today's price bar, shared by the current price and daily change.
+
+    Falls back to the last stored daily bar when Yahoo is unreachable.
+    """
+    return market_cache.get("price", (symbol,), lambda: _load_today(symbol))
+
+def get_current_price(symbol=config.STOCK_SYMBOL):
+    """Get the current stock price for the given symbol."""
+    todays_data = get_today_data(symbol)
+    if todays_data.empty:
+        logging.error(f"Failed to retrieve current price for {symbol}")
+        return None
+    return todays_data['Close'].iloc[-1]
+
+# Intraday bars per (symbol, interval), each in a ring of fixed size
+_intraday_rings = {}
+_intraday_lock = threading.Lock()
+
+def _intraday_ring(symbol, interval):
+    with _intraday_lock:
+        ring = _intraday_rings.get((symbol, interval))
+        if ring is None:
+            ring = _intraday_rings[(symbol, interval)] = IntradayRing(
+                ring_capacity(interval, config.INTRADAY_SESSIONS))
+        return ring
+
+def _sync_intraday(symbol, interval):
+    """Merge the intraday bars since the newest stored one into the ring.
+
+    The first call fetches enough calendar days to cover INTRADAY_SESSIONS
+    sessions (within what Yahoo serves for the interval). Later calls fetch
+    from the newest stored bar on, which may still have been forming. If
+    that bar is older than Yahoo serves (after a long outage or idle
+    period), the gap cannot be filled, so the ring starts over.
+    When Yahoo is unreachable the stored bars are served as they are.
+    """
+    ring = _intraday_ring(symbol, interval)
+    today = pd.Timestamp.now(tz="UTC").normalize()
+    oldest = today - pd.Timedelta(days=INTERVAL_MAX_DAYS[interval] - 1)
+    start = ring.last_timestamp()
+    if start is not None and start < oldest:
+        logging.info(f"{symbol} {interval} bars are older than Yahoo serves; fetching them again")
+        ring.clear()
+        start = None
+    if start is None:
+        days = min(config.INTRADAY_SESSIONS * 7 // 5 + 4, INTERVAL_MAX_DAYS[interval] - 1)
+        start = today - pd.Timedelta(days=days)
+
+    def fetch():
+        bars = provider.intraday(symbol, interval=interval, start=start)
+        if bars.empty:
+            raise ValueError("Empty intraday data returned from the data provider")
+        return bars
+
+    try:
+        ring.merge(_call_upstream("intraday", fetch))
+    except UpstreamUnavailable as e:
+        logging.warning(f"Failed to retrieve {symbol} {interval} bars since {start}: {e}")
+        return Stale(ring.frame(config.INTRADAY_SESSIONS), "intraday")
+    return ring.frame(config.INTRADAY_SESSIONS)
+
+def get_intraday_data(symbol=config.STOCK_SYMBOL, interval=None):
+    """Get the intraday bars of the current session and the ones before it.
+
+    Bars are kept in a fixed-size ring buffer per symbol and interval
+    (config.INTRADAY_INTERVAL by default), so memory does not grow with
+    uptime. Each refresh only fetches the bars since the newest stored one,
+    also in workers that got their earlier bars through the shared cache.
+
+    Returns:
+        DataFrame of OHLCV bars indexed by market-time timestamp, covering
+        at most INTRADAY_SESSIONS sessions (empty if nothing was fetched yet)
+    """
+    interval = interval or config.INTRADAY_INTERVAL
+    bars = market_cache.get("intraday", (symbol, interval), lambda: _sync_intraday(symbol, interval))
+    # With a shared cache the bars may come from another worker's ring; seed
+    # this worker's ring with them so its own next fetch is a delta as well
+    ring = _intraday_ring(symbol, interval)
+    last = ring.last_timestamp()
+    if not bars.empty and (last is None or last < bars.index[-1]):
+        ring.merge(bars)
+    return bars
+
+def reset_intraday():
+    """Drop the intraday rings so they are rebuilt with the current settings."""
+    with _intraday_lock:
+        _intraday_rings.clear()
+    market_cache.invalidate("intraday")
+
+config_reload.on_change(["INTRADAY_INTERVAL", "INTRADAY_SESSIONS"], reset_intraday)
+
+def get_historical_data(symbol=config.STOCK_SYMBOL, period="2y"):
+    """Get historical stock data.
+    
+    Daily bars come from the on-disk price store, which is synced with Yahoo
+    Finance at most once per history TTL regardless of the period requested.
     
     Args:
         symbol: Stock symbol
         period: Valid periods: 1d,5d,1mo,3mo,6mo,1y,2y,5y,10y,ytd,max
-        max_retries: Maximum number of retry attempts
-        retry_delay: Delay between retries in seconds
     
     Returns:
-        Pandas DataFrame with historical data or empty DataFrame on failure
+        Pandas DataFrame with OHLCV columns indexed by date, or empty DataFrame
+        on failure. Results are shared through the cache and must not be modified.
     """
-    for attempt in range(max_retries):
-        try:
-            ticker = yf.Ticker(symbol)
-            hist_data = ticker.history(period=period)
-            if not hist_data.empty:
-                return hist_data
-            raise ValueError("Empty data returned from Yahoo Finance")
-        except Exception as e:
-            logging.warning(f"Attempt {attempt+1}/{max_retries} failed: {str(e)}")
-            if attempt < max_retries - 1:
-                logging.info(f"Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-            else:
-                logging.error(f"Failed to retrieve historical data after {max_retries} attempts")
-                return pd.DataFrame()  # Return empty DataFrame on failure
-
-def get_vesting_dataframe():
-    """Convert vesting schedule to DataFrame with dollar values."""
-    vesting_data = []
-    total_value_usd = config.TOTAL_RSU_VALUE_USD
-    
-    for percentage, date in config.VESTING_SCHEDULE:
-        vesting_value = (percentage / 100) * total_value_usd
-        vesting_data.append({
-            'date': pd.to_datetime(date),
-            'percentage': percentage,
-            'value_usd': vesting_value,
-            'shares': 0  # Will be calculated later based on stock price
-        })
-    
-    df = pd.DataFrame(vesting_data)
-    return df
-
-def calculate_shares_from_vesting():
-    """Calculate number of shares from vesting schedule based on stock prices."""
-    vesting_df = get_vesting_dataframe()
-    price_data = get_historical_data(period="5y")  # Get enough historical data
-    
-    for idx, row in vesting_df.iterrows():
-        vesting_date = row['date']
-        # Find closest date in price data
-        if vesting_date in price_data.index:
-            price = price_data.loc[vesting_date, 'Close']
+    hist_data = market_cache.get("history", (symbol,), lambda: _sync_history(symbol))
+    return slice_period(hist_data, period)
+
+# Indicator state per symbol, extended as the cached history grows
+_indicator_sets = {}
+_indicator_lock = threading.Lock()
+
+def get_indicators(symbol=config.STOCK_SYMBOL, period="max", hist_data=None, columns=None):
+    """Get technical indicators (SMA, EMA, Bollinger bands, RSI, VWAP) of daily bars.
+
+    Indicators are computed once over the full history and then extended by
+    the bars that are new since the last call; a period is a slice of them.
+
+    Args:
+        symbol: Stock symbol
+        period: Valid periods as for get_historical_data
+        hist_data: Full daily history of symbol (fetched if not provided)
+        columns: Indicator columns to return (all if not provided), see
+            indicators.IndicatorSet
+
+    Returns:
+        DataFrame indexed by date like get_historical_data(symbol, period);
+        VWAP is anchored at the start of the period.
+    """
+    if hist_data is None:
+        hist_data = get_historical_data(symbol, period="max")
+    start = len(hist_data) - len(slice_period(hist_data, period))
+    with _indicator_lock:
+        indicator_set = _indicator_sets.get(symbol)
+        if indicator_set is None:
+            indicator_set = _indicator_sets[symbol] = IndicatorSet(
+                config.SMA_WINDOWS, config.EMA_WINDOWS, config.BOLLINGER_WINDOW,
+                config.BOLLINGER_STD, config.RSI_WINDOW
+            )
+        indicator_set.update(hist_data)
+        return indicator_set.frame(start, columns)
+
+def reset_indicators():
+    """Drop the indicator state so it is rebuilt with the current settings."""
+    with _indicator_lock:
+        _indicator_sets.clear()
+
+INDICATOR_KEYS = ("SMA_WINDOWS", "EMA_WINDOWS", "BOLLINGER_WINDOW", "BOLLINGER_STD", "RSI_WINDOW")
+config_reload.on_change(INDICATOR_KEYS, reset_indicators)
+
+def indicator_settings():
+    """The settings indicators are currently computed with, for cache keys."""
+    return [getattr(config, key) for key in INDICATOR_KEYS]
+
+# Months between tranches for generated vesting schedules
+VESTING_FREQUENCY_MONTHS = {"monthly": 1, "quarterly": 3}
+
+def generate_vesting_tranches(value_usd, start, years=4, frequency="quarterly"):
+    """Split one grant into equal tranches vesting every month or quarter.
+
+    The first tranche vests one period after start.
+
+    Returns:
+        Tuple of (DatetimeIndex of vesting dates, array of USD values)
+    """
+    step = VESTING_FREQUENCY_MONTHS[frequency]
+    count = years * 12 // step
+    start = pd.Timestamp(start)
+    
+    # Add whole months, keeping the start day but clamping it to the month's end
+    months = np.datetime64(start.strftime('%Y-%m'), 'M') + step * np.arange(1, count + 1)
+    month_starts = months.astype('datetime64[D]')
+    days_in_month = ((months + 1).astype('datetime64[D]') - month_starts).astype(int)
+    dates = month_starts + (np.minimum(start.day, days_in_month) - 1)
+    return pd.DatetimeIndex(dates), np.full(count, value_usd / count)
+
+def get_vesting_dataframe(profile=None):
+    """Convert vesting schedule to DataFrame with dollar values.
+
+    VESTING_SCHEDULE entries are either (percentage, date) tuples, where the
+    percentage is of TOTAL_RSU_VALUE_RMB, or grant dicts that are expanded
+    into monthly or quarterly tranches by generate_vesting_tranches. Tranche
+    percentages are always expressed relative to the total RSU value.
+
+    profile defaults to the one in config.py (see profiles).
+    """
+    if profile is None:
+        profile = profiles.from_config()
+    dates = []
+    values = []
+    total_value_usd = profile.total_rsu_value_usd
+    
+    for entry in profile.vesting_schedule:
+        if isinstance(entry, dict):
+            grant_dates, grant_values = generate_vesting_tranches(
+                entry['value_rmb'] / profile.currency_exchange_rate,
+                entry['start'],
+                years=entry.get('years', 4),
+                frequency=entry.get('frequency', "quarterly"),
+            )
+            dates.append(grant_dates)
+            values.append(grant_values)
         else:
-            # Get the closest date before vesting date
-            closest_date = price_data.index[price_data.index <= vesting_date][-1]
-            price = price_data.loc[closest_date, 'Close']
-        
-        # Calculate shares based on price (assuming vesting date price)
-        vesting_df.at[idx, 'shares'] = row['value_usd'] / price
-        vesting_df.at[idx, 'price_at_vesting'] = price
+            percentage, date = entry
+            dates.append(pd.DatetimeIndex([pd.to_datetime(date)]))
+            values.append(np.array([(percentage / 100) * total_value_usd]))
+    
+    value_usd = np.concatenate(values) if values else np.array([])
+    df = pd.DataFrame({
+        'date': dates[0].append(dates[1:]) if dates else pd.DatetimeIndex([]),
+        'percentage': value_usd / total_value_usd * 100,
+        'value_usd': value_usd,
+        'shares': 0.0,  # Will be calculated later based on stock price
+    })
+    return df.sort_values('date', kind='stable').reset_index(drop=True)
+
+def calculate_shares_from_vesting(price_data=None, profile=None):
+    """Calculate number of shares from vesting schedule based on stock prices.
+
+    Each tranche is priced at the close of the last trading day on or before
+    its vesting date, found for all tranches at once with a binary search over
+    the trading-day index (an as-of join). Tranches vesting before the first
+    available bar get a NaN price and share count, as do all tranches when
+    there is no history at all.
+
+    price_data defaults to the full daily history, profile to the one in
+    config.py.
+    """
+    vesting_df = get_vesting_dataframe(profile)
+    if price_data is None:
+        price_data = get_historical_data(period="max")
+    
+    trading_days = price_data.index
+    vesting_dates = pd.DatetimeIndex(vesting_df['date'])
+    if trading_days.tz is not None:
+        vesting_dates = vesting_dates.tz_localize(trading_days.tz)
+    
+    if price_data.empty:
+        prices = np.full(len(vesting_dates), np.nan)
+    else:
+        positions = trading_days.searchsorted(vesting_dates, side='right') - 1
+        closes = price_data['Close'].to_numpy(dtype=float)
+        prices = np.where(positions >= 0, closes[np.maximum(positions, 0)], np.nan)
+    
+    # Calculate shares based on price (assuming vesting date price)
+    vesting_df['shares'] = vesting_df['value_usd'].to_numpy() / prices
+    vesting_df['price_at_vesting'] = prices
     
     return vesting_df
 
-def calculate_selling_strategy(strategy=config.DEFAULT_STRATEGY):
-    """Calculate selling strategy based on selected approach."""
-    vesting_df = calculate_shares_from_vesting()
-    total_shares = vesting_df['shares'].sum()
+class PlanCache:
+    """Thread-safe LRU cache of computed selling plans.
+
+    Keys include every input a plan depends on, so a stale plan is never
+    served; invalidate() exists for when those inputs change in ways the
+    key cannot see (config reloads, re-adjusted history).
+    """
+
+    def __init__(self, maxsize, name="plans"):
+        self.maxsize = maxsize
+        self.name = name
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """Return the plan for key, building and storing it on a miss."""
+        with self._lock:
+            if key in self._plans:
+                self._plans.move_to_end(key)
+                metrics.MEMO_CACHE_REQUESTS.inc(cache=self.name, result="hit")
+                return self._plans[key]
+        metrics.MEMO_CACHE_REQUESTS.inc(cache=self.name, result="miss")
+        plan = build()
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+        return plan
+
+    def invalidate(self, match=None):
+        """Drop every entry, or only those whose key match(key) accepts."""
+        with self._lock:
+            if match is None:
+                self._plans.clear()
+            else:
+                for key in [k for k in self._plans if match(k)]:
+                    del self._plans[key]
+
+plan_cache = PlanCache(config.PLAN_CACHE_SIZE)
+
+def invalidate_plans():
+    """Drop every memoized selling plan (call after config or data changes)."""
+    plan_cache.invalidate()
+
+def bucket_price(price):
+    """Snap a price to the nearest bucket of PLAN_PRICE_BUCKET_PCT width."""
+    step = np.log1p(config.PLAN_PRICE_BUCKET_PCT / 100)
+    return float(np.exp(np.round(np.log(price) / step) * step))
+
+@dataclass(frozen=True)
+class PlanMatrix:
+    """Share plans of every strategy over the same selling months.
+
+    Built in one vectorized pass from the inputs all strategies share; each
+    strategy's plan is a row of `shares`. Arrays must not be modified.
+    """
+    strategies: tuple
+    dates: pd.DatetimeIndex
+    total_shares: float
+    shares: np.ndarray          # (strategies, months): shares to sell each month
+    planning_price: float       # Price the equal_value targets are set at
+    price_factors: np.ndarray   # Modeled price factor per month (dollar_cost_averaging)
+    regular_months: int         # Months before the reserve period (reserve_strategy)
+
+    def row(self, strategy):
+        """Shares to sell each month under one strategy."""
+        if strategy not in self.strategies:
+            raise ValueError(f"Unknown selling strategy: {strategy!r}")
+        return self.shares[self.strategies.index(strategy)]
+
+    @property
+    def cumulative_percent(self):
+        """(strategies, months): percent of all shares sold by each month."""
+        return np.cumsum(self.shares, axis=1) / self.total_shares * 100
+
+def _plan_inputs(vesting_df, current_price, hist_data, profile):
+    """Resolve the shared plan inputs: total shares, bucketed price, volatility."""
+    if vesting_df is None:
+        vesting_df = calculate_shares_from_vesting(profile=profile)
+    if current_price is None:
+        current_price = get_current_price()
+    if hist_data is None:
+        hist_data = get_historical_data(period="1y")
+    else:
+        hist_data = slice_period(hist_data, "1y")
     
+    total_shares = round(float(vesting_df['shares'].sum()), 6)
+    # Normalized amplitude of price variations (1-year std / mean)
+    amplitude = round(hist_data['Close'].std() / hist_data['Close'].mean(), 3)
+    return total_shares, bucket_price(current_price), amplitude
+
+def calculate_plan_matrix(vesting_df=None, current_price=None, hist_data=None, profile=None):
+    """Build the strategies x months share matrix for all strategies at once.
+
+    Inputs are fetched when not given, as for calculate_selling_strategy.
+    Matrices are memoized by plan settings, total shares, bucketed current
+    price and rounded volatility, so profiles with the same inputs share one.
+    """
+    if profile is None:
+        profile = profiles.from_config()
+    inputs = _plan_inputs(vesting_df, current_price, hist_data, profile)
+    key = ("matrix", profile.plan_key()) + inputs
+    return plan_cache.get(key, lambda: _build_plan_matrix(*inputs, profile))
+
+def _build_plan_matrix(total_shares, planning_price, amplitude, profile):
     # Create date range for the selling period
-    start_date = pd.to_datetime(config.START_DATE)
-    end_date = pd.to_datetime(config.END_DATE)
-    date_range = pd.date_range(start=start_date, end=end_date, freq='MS')  # Monthly start frequency
+    start_date = pd.to_datetime(profile.start_date)
+    end_date = pd.to_datetime(profile.end_date)
+    dates = pd.date_range(start=start_date, end=end_date, freq='MS')  # Monthly start frequency
+    n_months = len(dates)
+    x = np.arange(n_months, dtype=float)
+    
+    # Equal distribution sells the same number of shares each month; equal
+    # value targets the same dollars at the planning price, which is the same
+    equal = np.full(n_months, 1 / n_months)
+    
+    # Dollar cost averaging sells more when a model price curve (sine wave +
+    # 5% annual trend + seeded noise) is higher
+    trend = 0.05
+    noise = np.random.RandomState(42).normal(0, amplitude / 3, n_months)
+    price_factors = 1 + amplitude * np.sin(x * np.pi / 6) + trend * x / n_months + noise
+    
+    # Reserve strategy sells (100 - reserve)% over the first 75% of months and
+    # the reserve over the rest
+    reserve_pct = profile.reserve_percentage
+    regular_months = int(n_months * 0.75)
+    reserve = np.where(
+        x < regular_months,
+        (100 - reserve_pct) / 100 / regular_months,
+        reserve_pct / 100 / max(n_months - regular_months, 1)
+    )
+    
+    weights = {
+        "equal_distribution": equal,
+        "equal_value": equal,
+        "dollar_cost_averaging": price_factors / price_factors.sum(),
+        "reserve_strategy": reserve,
+    }
+    strategies = tuple(s for s in config.SELLING_STRATEGIES if s in weights)
+    return PlanMatrix(
+        strategies=strategies,
+        dates=dates,
+        total_shares=total_shares,
+        shares=total_shares * np.vstack([weights[s] for s in strategies]),
+        planning_price=planning_price,
+        price_factors=price_factors,
+        regular_months=regular_months,
+    )
+
+def calculate_selling_strategy(strategy=config.DEFAULT_STRATEGY, vesting_df=None,
+                               current_price=None, hist_data=None, profile=None):
+    """Calculate selling strategy based on selected approach.
+
+    The vesting shares, current price and daily history are fetched when not
+    given; callers holding a market snapshot pass them in instead. profile
+    defaults to the one in config.py; vesting_df must belong to it.
+
+    The plan is one row of the plan matrix, expanded into a DataFrame.
+    Plans are memoized by strategy, the profile settings the strategy reads
+    (profile.plan_key) and the inputs the strategy actually uses: total
+    shares for all of them, the current price (bucketed to
+    PLAN_PRICE_BUCKET_PCT) for equal_value, and the 1-year volatility
+    (rounded to 3 decimals) for dollar_cost_averaging. The returned
+    DataFrame is shared and must not be modified.
+    """
+    if profile is None:
+        profile = profiles.from_config()
+    inputs = _plan_inputs(vesting_df, current_price, hist_data, profile)
+    total_shares, planning_price, amplitude = inputs
+    strategy_input = {"equal_value": planning_price, "dollar_cost_averaging": amplitude}.get(strategy)
+    
+    def build():
+        matrix = plan_cache.get(("matrix", profile.plan_key()) + inputs,
+                                lambda: _build_plan_matrix(*inputs, profile))
+        return _plan_frame(matrix, strategy)
     
-    selling_df = pd.DataFrame(index=date_range)
+    key = (strategy, profile.plan_key(strategy), total_shares, strategy_input)
+    return plan_cache.get(key, build)
+
+def _plan_frame(matrix, strategy):
+    """Expand one strategy's row of the plan matrix into a selling DataFrame."""
+    shares = matrix.row(strategy)
+    total_shares = matrix.total_shares
+    
+    selling_df = pd.DataFrame(index=matrix.dates)
     selling_df.index.name = 'date'
     selling_df['month'] = selling_df.index.strftime('%Y-%m')
     
-    if strategy == "equal_distribution":
-        # Sell equal number of shares each month
-        shares_per_month = total_shares / len(selling_df)
-        selling_df['shares_to_sell'] = shares_per_month
-        
-    elif strategy == "equal_value":
-        # Attempt to sell equal dollar value each month (estimate)
-        current_price = get_current_price()
-        value_per_month = (total_shares * current_price) / len(selling_df)
-        
+    if strategy == "equal_value":
         # Initial estimate - will be updated with real prices as they come
-        selling_df['target_value'] = value_per_month
-        selling_df['estimated_shares'] = value_per_month / current_price
-        selling_df['shares_to_sell'] = selling_df['estimated_shares']
-        
+        selling_df['target_value'] = shares * matrix.planning_price
+        selling_df['estimated_shares'] = shares
     elif strategy == "dollar_cost_averaging":
-        # Sell more when price is higher (varies with price)
-        current_price = get_current_price()
-        
-        # Get historical price volatility to estimate price variations
-        hist_data = get_historical_data(period="1y")
-        price_std = hist_data['Close'].std()
-        price_mean = hist_data['Close'].mean()
-        
-        # Create a model price curve (just for planning)
-        # This will be replaced with actual prices when they become available
-        x = np.linspace(0, len(selling_df)-1, len(selling_df))
-        
-        # Model price variations with a sine wave + trend
-        trend = 0.05  # Assuming 5% annual trend
-        amplitude = price_std / price_mean  # Normalized amplitude
-        
-        # Generate modeled prices with some randomness
-        np.random.seed(42)  # For reproducibility
-        noise = np.random.normal(0, amplitude/3, len(x))
-        price_factors = 1 + amplitude * np.sin(x * np.pi / 6) + trend * x / len(x) + noise
-        
-        selling_df['price_factor'] = price_factors
-        # Adjust shares based on price - sell more when price is higher
-        selling_df['shares_to_sell'] = total_shares * (selling_df['price_factor'] / selling_df['price_factor'].sum())
-        
+        selling_df['price_factor'] = matrix.price_factors
     elif strategy == "reserve_strategy":
-        # Hold some percentage as reserve for last months
-        reserve_pct = config.RESERVE_PERCENTAGE
-        regular_shares = total_shares * (100 - reserve_pct) / 100
-        reserve_shares = total_shares * reserve_pct / 100
-        
-        # Regular period
-        regular_months = int(len(selling_df) * 0.75)  # First 75% of months
-        shares_per_regular_month = regular_shares / regular_months
-        
-        # Reserve period
-        reserve_months = len(selling_df) - regular_months
-        shares_per_reserve_month = reserve_shares / reserve_months
-        
-        selling_df['period'] = 'regular'
-        selling_df.iloc[regular_months:, selling_df.columns.get_loc('period')] = 'reserve'
-        
-        selling_df['shares_to_sell'] = shares_per_regular_month
-        selling_df.loc[selling_df['period'] == 'reserve', 'shares_to_sell'] = shares_per_reserve_month
+        selling_df['period'] = np.where(
+            np.arange(len(shares)) < matrix.regular_months, 'regular', 'reserve'
+        )
+    
+    selling_df['shares_to_sell'] = shares
     
     # Calculate cumulative shares sold
-    selling_df['cumulative_shares'] = selling_df['shares_to_sell'].cumsum()
+    selling_df['cumulative_shares'] = np.cumsum(shares)
     selling_df['remaining_shares'] = total_shares - selling_df['cumulative_shares']
     
     # Calculate percentages
@@ -179,12 +716,30 @@ def calculate_selling_strategy(strategy=config.DEFAULT_STRATEGY):
     
     return selling_df
 
+def get_strategy_plans(vesting_df=None, current_price=None, hist_data=None, profile=None):
+    """Return the shares to sell each month for every configured strategy.
+
+    Returns:
+        Dict of strategy -> numpy array of shares to sell per month
+    """
+    matrix = calculate_plan_matrix(vesting_df, current_price, hist_data, profile)
+    return dict(zip(matrix.strategies, matrix.shares))
+
+# Last stats successfully fetched, served while the stats breaker is failing
+_last_good_stats = {}
+
 def get_stock_stats():
-    """Get key statistics for the stock."""
-    ticker = yf.Ticker(config.STOCK_SYMBOL)
-    
+    """Get key statistics for the stock.
+
+    Returns the last good stats when Yahoo is failing; upstream_status()
+    reports them as stale.
+    """
+    return market_cache.get("stats", (config.STOCK_SYMBOL,), _fetch_stock_stats)
+
+def _fetch_stock_stats():
+    global _last_good_stats
     try:
-        info = ticker.info
+        info = _call_upstream("stats", lambda: provider.info(config.STOCK_SYMBOL))
         stats = {
             'marketCap': info.get('marketCap', 'N/A'),
             'forwardPE': info.get('forwardPE', 'N/A'),
@@ -195,31 +750,8 @@ def get_stock_stats():
             'twoHundredDayAverage': info.get('twoHundredDayAverage', 'N/A'),
             'averageVolume': info.get('averageVolume', 'N/A'),
         }
+        _last_good_stats = stats
         return stats
     except Exception as e:
-        print(f"Error fetching stats: {e}")
-        return {}
-
-def check_price_alerts(previous_price=None):
-    """Check if current price triggers any alerts based on thresholds."""
-    if previous_price is None:
-        return None
-    
-    current_price = get_current_price()
-    percent_change = ((current_price - previous_price) / previous_price) * 100
-    
-    alerts = []
-    if percent_change >= config.PRICE_INCREASE_ALERT:
-        alerts.append({
-            'type': 'increase',
-            'message': f'Price increased by {percent_change:.2f}% to ${current_price:.2f}',
-            'change': percent_change
-        })
-    elif percent_change <= -config.PRICE_DECREASE_ALERT:
-        alerts.append({
-            'type': 'decrease',
-            'message': f'Price decreased by {abs(percent_change):.2f}% to ${current_price:.2f}',
-            'change': percent_change
-        })
-    
-    return alerts if alerts else None 
\ No newline at end of file
+        logging.warning(f"Failed to retrieve {config.STOCK_SYMBOL} stats: {e}")
+        return Stale(_last_good_stats, "stats")
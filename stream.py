@@ -0,0 +1,160 @@
+"""Server-Sent Events push of market snapshot changes.
+
+Every snapshot the refresher publishes is reduced to a small tick: one
+fingerprint per topic (TICK_TOPICS), i.e. per group of snapshot values that
+dashboard callbacks read. A tick is broadcast once, and only when it
+differs from the previous one. Each browser holds one GET /stream connection,
+and assets/stream.js copies ticks into the market-tick store. A clientside
+callback splits that into one tick-<topic> store per topic and updates only
+the topics that changed, so each server callback runs only when a value it
+reads changed. When the stream is unavailable the page polls GET /tick with
+dcc.Interval instead, through the same split.
+
+An open stream holds a server thread, so streams are bounded: each response
+ends after STREAM_MAX_AGE seconds (the browser reconnects and resumes from
+its Last-Event-ID), and a process serves at most STREAM_MAX_CLIENTS streams
+at once. Further tabs get 503 and poll, leaving threads for the callbacks.
+"""
+import json
+import os
+import threading
+import time
+from flask import Response, request
+import config
+import config_reload
+import market_snapshot
+import metrics
+import stock_data
+import store_codec
+
+class SnapshotBroadcaster:
+    """Holds the latest tick and wakes every waiting stream when it changes."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._sequence = 0
+        self._tick = None
+        self._key = None
+
+    def publish(self, snapshot):
+        """Broadcast a tick for snapshot unless it matches the previous one."""
+        tick = snapshot_tick(snapshot)
+        key = {k: v for k, v in tick.items() if k not in ('version', 'created_at')}
+        with self._condition:
+            if key == self._key:
+                return
+            self._key = key
+            self._sequence += 1
+            self._tick = tick
+            self._condition.notify_all()
+
+    def wait(self, last_seen, timeout):
+        """Wait up to timeout for a tick newer than last_seen.
+
+        Returns:
+            (sequence, tick); tick is None if nothing new arrived in time
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._sequence > last_seen, timeout)
+            if self._sequence > last_seen:
+                return self._sequence, self._tick
+            return last_seen, None
+
+# Groups of snapshot values dashboard callbacks depend on, each pushed to a
+# tick-<topic> store
+TICK_TOPICS = ("history", "price", "plan_price", "intraday", "upstream", "config")
+
+def _plain(value):
+    return None if value is None else float(value)
+
+def snapshot_tick(snapshot):
+    """The JSON-serializable part of a snapshot that clients are notified about."""
+    price = snapshot.current_price
+    today = snapshot.today
+    today_open = None if today is None or today.empty else today['Open'].iloc[0]
+    return {
+        'version': snapshot.version,
+        'created_at': snapshot.created_at.isoformat(),
+        'history': snapshot.history_key,  # Any bar changed, including a re-adjustment
+        'price': [_plain(price), _plain(snapshot.previous_close), _plain(today_open)],
+        'plan_price': None if price is None else stock_data.bucket_price(price),  # What selling plans use
+        'intraday': store_codec.frame_fingerprint(snapshot.intraday),
+        'upstream': [[s['name'], s['state'], s['stale']] for s in snapshot.upstream],
+        'config': config_reload.revision,  # Changes after a config reload so clients refetch
+    }
+
+# One broadcaster per process, fed by the shared snapshot refresher
+broadcaster = SnapshotBroadcaster()
+market_snapshot.refresher.subscribe(broadcaster.publish)
+config_reload.subscribe(lambda changed: broadcaster.publish(market_snapshot.refresher.latest()))
+
+_open_streams = 0
+_open_lock = threading.Lock()
+
+def _acquire_stream():
+    """Take a stream slot, or return False if STREAM_MAX_CLIENTS are open."""
+    global _open_streams
+    with _open_lock:
+        if _open_streams >= config.STREAM_MAX_CLIENTS:
+            return False
+        _open_streams += 1
+        return True
+
+def _release_stream():
+    global _open_streams
+    with _open_lock:
+        _open_streams -= 1
+
+def _last_seen(last_event_id):
+    """Sequence to resume after, from a reconnecting browser's Last-Event-ID.
+
+    Event ids carry the process id, since sequences are per process; a
+    browser reconnecting to another worker gets the current tick again.
+    """
+    pid, _, sequence = (last_event_id or "").partition("-")
+    if pid == str(os.getpid()) and sequence.isdigit():
+        return int(sequence)
+    return 0
+
+def _events(last_seen):
+    # Make sure the refresher is running and the stream starts with a tick
+    broadcaster.publish(market_snapshot.get_snapshot())
+    metrics.STREAM_CLIENTS.inc()
+    deadline = time.monotonic() + config.STREAM_MAX_AGE
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return  # Free the thread; the browser reconnects
+        last_seen, tick = broadcaster.wait(last_seen, min(config.STREAM_HEARTBEAT, remaining))
+        if tick is None:
+            yield ": keep-alive\n\n"
+        else:
+            event = f"id: {os.getpid()}-{last_seen}\ndata: {json.dumps(tick)}\n\n"
+            metrics.STREAM_EVENT_BYTES.observe(len(event))
+            yield event
+
+def latest_tick():
+    """The tick of the current snapshot, for clients polling instead of streaming."""
+    broadcaster.publish(market_snapshot.get_snapshot())
+    return broadcaster.wait(0, 0)[1]
+
+def register(server):
+    """Add the GET /stream Server-Sent Events and GET /tick routes to the Flask server."""
+    @server.route("/tick")
+    def tick():
+        return Response(json.dumps(latest_tick()), mimetype="application/json",
+                        headers={"Cache-Control": "no-cache"})
+
+    @server.route("/stream")
+    def stream():
+        if not _acquire_stream():
+            # EventSource gives up on a 503 and the page polls instead
+            return Response("Too many open streams", status=503, headers={"Retry-After": str(config.STREAM_MAX_AGE)})
+        events = _events(_last_seen(request.headers.get("Last-Event-ID")))
+        response = Response(events, mimetype="text/event-stream", headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Stop proxies from buffering events
+        })
+        # Runs when the response ends or the browser disconnects
+        response.call_on_close(_release_stream)
+        return response
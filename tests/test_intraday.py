@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+import intraday
+import stock_data
+from intraday import IntradayRing, INTERVAL_MAX_DAYS
+from price_store import OHLCV_COLUMNS
+from providers import MARKET_TIMEZONE
+
+def minute_bars(start, count, interval="1m"):
+    start = pd.Timestamp(start)
+    start = start.tz_localize(MARKET_TIMEZONE) if start.tz is None else start.tz_convert(MARKET_TIMEZONE)
+    index = pd.date_range(start, periods=count, freq=f"{intraday.INTERVAL_MINUTES[interval]}min", name='Date')
+    values = np.arange(count, dtype=float) + 100
+    return pd.DataFrame({column: values for column in OHLCV_COLUMNS}, index=index)
+
+class WindowedProvider:
+    """Serves intraday bars like Yahoo: only within INTERVAL_MAX_DAYS."""
+
+    def __init__(self):
+        self.starts = []
+
+    def intraday(self, symbol, interval, start):
+        self.starts.append(start)
+        now = pd.Timestamp.now(tz="UTC")
+        if start < now.normalize() - pd.Timedelta(days=INTERVAL_MAX_DAYS[interval]):
+            raise ValueError("Requested range is outside the available window")
+        return minute_bars(now.floor("min") - pd.Timedelta(minutes=9), 10, interval)
+
+@pytest.fixture
+def provider(monkeypatch):
+    fake = WindowedProvider()
+    monkeypatch.setattr(stock_data, "provider", fake)
+    stock_data.reset_intraday()
+    yield fake
+    stock_data.reset_intraday()
+
+def test_ring_keeps_newest_bars():
+    ring = IntradayRing(5)
+    ring.merge(minute_bars("2024-03-04 09:30", 8))
+    frame = ring.frame()
+    assert len(frame) == 5
+    assert frame['Close'].iloc[-1] == 107
+
+def test_clear_empties_ring():
+    ring = IntradayRing(5)
+    ring.merge(minute_bars("2024-03-04 09:30", 3))
+    ring.clear()
+    assert ring.last_timestamp() is None
+    assert ring.frame().empty
+
+def test_stale_ring_is_refetched_within_yahoo_window(provider):
+    ring = stock_data._intraday_ring("AMZN", "1m")
+    ring.merge(minute_bars(pd.Timestamp.now(tz=MARKET_TIMEZONE).normalize() - pd.Timedelta(days=10), 30))
+    bars = stock_data._sync_intraday("AMZN", "1m")
+    oldest = pd.Timestamp.now(tz="UTC").normalize() - pd.Timedelta(days=INTERVAL_MAX_DAYS["1m"])
+    assert provider.starts[-1] >= oldest
+    assert len(bars) == 10  # The bars from before the gap were dropped
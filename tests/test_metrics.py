@@ -0,0 +1,30 @@
+import metrics
+
+def _registry():
+    registry = metrics.Registry()
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    return registry, requests, latency
+
+def test_scrape_reports_all_workers(tmp_path, monkeypatch):
+    store = metrics.SharedStore(str(tmp_path / "metrics.sqlite"))
+    other, requests, latency = _registry()
+    requests.inc(2, route="/a")
+    requests.inc(route="/b")
+    latency.observe(0.5)
+    monkeypatch.setattr(metrics.os, "getpid", lambda: 1)
+    store.flush(other)
+    monkeypatch.undo()
+
+    worker, requests, latency = _registry()
+    requests.inc(route="/a")
+    latency.observe(0.05)
+    text = worker.render(store.totals(worker))
+    assert 'requests_total{route="/a"} 3' in text
+    assert 'requests_total{route="/b"} 1' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert "latency_seconds_count 2" in text
+
+    store.clear()
+    assert 'requests_total{route="/a"} 1' in worker.render(store.totals(worker))
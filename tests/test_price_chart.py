@@ -0,0 +1,44 @@
+import pandas as pd
+from dash import Patch
+import app
+import store_codec
+
+def stock_payload(bars):
+    return store_codec.encode_frame(bars.rename(columns=str.lower), index='date',
+                                    meta={'bar_size': "1D", 'period': "1y", 'overlays': [], 'indicators': None})
+
+def daily_bars(days=30, start="2024-01-01"):
+    dates = pd.bdate_range(start, periods=days, name='Date')
+    close = pd.Series(range(100, 100 + days), index=dates, dtype=float)
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close, 'Volume': 1000.0})
+
+def render(bars, state=None):
+    return app.update_price_chart(stock_payload(bars), None, state)
+
+def test_moving_last_bar_is_patched():
+    bars = daily_bars()
+    _, state = render(bars)
+    bars.iloc[-1, bars.columns.get_loc('Close')] += 2
+    figure, _ = render(bars, state)
+    assert isinstance(figure, Patch)
+
+def test_appended_bar_is_patched_when_window_rolls():
+    bars = daily_bars(31)
+    _, state = render(bars.iloc[:-1])
+    figure, _ = render(bars.iloc[1:], state)
+    assert isinstance(figure, Patch)
+
+def test_readjusted_history_rebuilds_figure():
+    bars = daily_bars()
+    _, state = render(bars)
+    # A split re-adjusts an earlier bar; dates and length stay the same
+    bars.iloc[:-1, bars.columns.get_loc('Close')] /= 2
+    figure, _ = render(bars, state)
+    assert not isinstance(figure, Patch)
+
+def test_readjusted_history_rebuilds_figure_on_new_bar():
+    bars = daily_bars(31)
+    _, state = render(bars.iloc[:-1])
+    bars.iloc[:5, bars.columns.get_loc('Open')] *= 0.98  # Dividend adjustment
+    figure, _ = render(bars, state)
+    assert not isinstance(figure, Patch)
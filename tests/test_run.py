@@ -0,0 +1,17 @@
+import importlib
+import config
+import run
+
+def test_stream_limit_follows_thread_count(monkeypatch):
+    monkeypatch.delenv("STOCK_TRACKER_THREADS", raising=False)
+    try:
+        run.use_thread_count(2)
+        assert config.THREADS == 2
+        assert config.STREAM_MAX_CLIENTS == 1
+        run.use_thread_count(1)
+        assert config.STREAM_MAX_CLIENTS == 1  # At least one stream
+        run.use_thread_count(16)
+        assert config.STREAM_MAX_CLIENTS == 8
+    finally:
+        monkeypatch.delenv("STOCK_TRACKER_THREADS", raising=False)
+        importlib.reload(config)
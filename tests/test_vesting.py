@@ -0,0 +1,30 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import market_snapshot
+import profiles
+import stock_data
+from price_store import OHLCV_COLUMNS
+
+def empty_history():
+    return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([], name='Date'), dtype=float)
+
+def test_vesting_without_history_has_no_prices():
+    vesting = stock_data.calculate_shares_from_vesting(empty_history())
+    assert len(vesting) > 0
+    assert vesting['price_at_vesting'].isna().all()
+    assert vesting['shares'].isna().all()
+
+def test_profile_vesting_without_history_is_none():
+    snapshot = market_snapshot.MarketSnapshot(version=1, created_at=datetime.now(), symbol="AMZN",
+                                              history=empty_history())
+    profile = profiles.from_config("other", {"TOTAL_RSU_VALUE_RMB": 1000})
+    assert market_snapshot.get_vesting(snapshot, profile) is None
+
+def test_vesting_prices_use_last_close_on_or_before_vesting_date():
+    dates = pd.bdate_range("2020-01-01", "2030-12-31", name='Date')
+    closes = np.arange(len(dates), dtype=float) + 1
+    history = pd.DataFrame({column: closes for column in OHLCV_COLUMNS}, index=dates)
+    vesting = stock_data.calculate_shares_from_vesting(history)
+    for date, price in zip(vesting['date'], vesting['price_at_vesting']):
+        assert price == history['Close'][:pd.Timestamp(date)].iloc[-1]